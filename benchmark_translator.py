@@ -0,0 +1,350 @@
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import platform
+import threading
+import subprocess
+
+# Keep the benchmark away from the user's real cache and daemon
+os.environ["CJT_CACHE_PATH"] = ""
+os.environ["CJT_HISTORY_PATH"] = ""
+os.environ["CJT_HISTORY_INDEX_PATH"] = ""
+os.environ["CJT_WATCH_CLIPBOARD"] = "0"
+os.environ["CJT_METRICS_LOG"] = ""
+
+DEFAULT_SIZES = [10, 100, 1000, 10000, 100000, 1000000, 4000000]
+WORDS = ("the quick brown fox jumps over lazy dog ticket error failed request server "
+         "please retry later template customer order status update").split()
+
+class FakeClipboard:
+    """Thread-safe in-memory stand-in for pyperclip"""
+    def __init__(self):
+        self._text = ""
+        self._lock = threading.Lock()
+        self.copies = 0
+
+    def paste(self):
+        with self._lock:
+            return self._text
+
+    def copy(self, text):
+        with self._lock:
+            self._text = text
+            self.copies += 1
+
+def make_fake_backend(app, latency, per_char, network=False):
+    """Create a deterministic translation backend with configurable latency.
+    A network backend goes through the rate limiter, circuit breaker and scheduler."""
+    class FakeBackend(app.TranslationBackend):
+        name = "fake-network" if network else "fake"
+        supports_batch = True
+        requires_network = network
+
+        def __init__(self):
+            super().__init__()
+            self.calls = 0
+            self._lock = threading.Lock()
+
+        def translate(self, text, dest='ja', src='auto'):
+            with self._lock:
+                self.calls += 1
+            time.sleep(latency + per_char * len(text))
+            # Map printable ASCII to full-width forms; keeps line structure intact
+            return "".join(chr(ord(c) + 0xFEE0) if "!" <= c <= "~" else c for c in text)
+
+    return FakeBackend()
+
+def make_payload(size, seed):
+    """Build deterministic English-like text of roughly `size` characters"""
+    rng = random.Random(seed)
+    parts = []
+    length = 0
+    sentence = []
+    while length < size:
+        word = rng.choice(WORDS)
+        sentence.append(word)
+        length += len(word) + 1
+        if len(sentence) >= rng.randint(6, 14):
+            parts.append(" ".join(sentence).capitalize() + rng.choice([". ", ". ", "! ", "? ", ".\n", ".\n\n"]))
+            sentence = []
+    if sentence:
+        parts.append(" ".join(sentence).capitalize() + ".")
+    return "".join(parts)[:size]
+
+def percentiles(values):
+    """Summarize a list of seconds as millisecond percentiles"""
+    ordered = sorted(values)
+    if not ordered:
+        return {}
+    def pick(pct):
+        index = max(0, min(len(ordered) - 1, int(round(pct / 100.0 * len(ordered))) - 1))
+        return round(ordered[index] * 1000, 3)
+    return {
+        "count": len(ordered),
+        "min_ms": round(ordered[0] * 1000, 3),
+        "p50_ms": pick(50),
+        "p95_ms": pick(95),
+        "p99_ms": pick(99),
+        "max_ms": round(ordered[-1] * 1000, 3),
+    }
+
+class ResourceSampler:
+    """Track peak RSS and thread count while a scenario runs"""
+    def __init__(self, interval=0.01):
+        self.interval = interval
+        self.peak_threads = threading.active_count()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.peak_threads = max(self.peak_threads, threading.active_count())
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+def peak_rss_bytes():
+    """Peak resident set size of this process, if the platform reports it"""
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if platform.system() == "Darwin" else peak * 1024
+    except ImportError:
+        pass
+    try:
+        import psutil
+        info = psutil.Process().memory_info()
+        return getattr(info, "peak_wset", info.rss)
+    except ImportError:
+        return None
+
+def git_commit():
+    """Current commit of the working tree, for comparing runs"""
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"],
+                                       stderr=subprocess.DEVNULL).decode().strip()
+    except Exception:
+        return None
+
+def reset_cache(app):
+    """Start a scenario with an empty in-memory cache"""
+    app.translation_cache = app.TranslationCache(path="")
+
+def bench_latency(app, clipboard, size, iterations, warm):
+    """End-to-end translate_clipboard() latency for one payload size"""
+    reset_cache(app)
+    payload = make_payload(size, seed=size)
+    if warm:
+        app.translate_clipboard(False, clipboard_text=payload)
+    samples = []
+    with ResourceSampler() as sampler:
+        for i in range(iterations):
+            # Cold runs use a fresh cache so every iteration does the full translation
+            if not warm:
+                reset_cache(app)
+            clipboard.copy(payload)
+            start = time.perf_counter()
+            result = app.translate_clipboard(False)
+            samples.append(time.perf_counter() - start)
+            if result is None:
+                raise RuntimeError(f"Translation failed for payload of {size} characters")
+    return dict(percentiles(samples), size=size, warm=warm, peak_threads=sampler.peak_threads)
+
+def bench_concurrent(app, clipboard, size, presses, concurrency):
+    """Throughput of many simultaneous translations of distinct texts"""
+    reset_cache(app)
+    payloads = [make_payload(size, seed=i) + f" #{i}" for i in range(presses)]
+    samples = []
+    lock = threading.Lock()
+    next_index = [0]
+
+    def worker():
+        while True:
+            with lock:
+                if next_index[0] >= len(payloads):
+                    return
+                text = payloads[next_index[0]]
+                next_index[0] += 1
+            start = time.perf_counter()
+            app.translate_clipboard(False, clipboard_text=text)
+            with lock:
+                samples.append(time.perf_counter() - start)
+
+    with ResourceSampler() as sampler:
+        start = time.perf_counter()
+        threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+    return dict(percentiles(samples), size=size, presses=presses, concurrency=concurrency,
+                throughput_per_s=round(presses / elapsed, 2), peak_threads=sampler.peak_threads)
+
+def bench_hotkey_burst(app, clipboard, presses, interval):
+    """Hotkey presses through the translation worker, including coalescing and drops"""
+    reset_cache(app)
+    worker = app.TranslationWorker()
+    with ResourceSampler() as sampler:
+        start = time.perf_counter()
+        for i in range(presses):
+            # Every other press repeats the previous clipboard content
+            clipboard.copy(make_payload(200, seed=i // 2) + f" #{i // 2}")
+            worker.submit(show_notification_flag=False)
+            time.sleep(interval)
+        while worker.is_busy():
+            time.sleep(0.005)
+        elapsed = time.perf_counter() - start
+    stats = worker.stats()
+    return dict(stats, presses=presses, elapsed_s=round(elapsed, 3),
+                throughput_per_s=round(stats["completed"] / elapsed, 2), peak_threads=sampler.peak_threads)
+
+def bench_rate_limited(app, latency, per_char, extra_chunks, background):
+    """A paste with more chunks than the request burst, then background requests
+    competing with interactive ones, against a network backend under the
+    configured rate limits (CJT_RATE_LIMIT_PER_MINUTE / CJT_RATE_LIMIT_BURST)"""
+    reset_cache(app)
+    backend = make_fake_backend(app, latency, per_char, network=True)
+    app.translation_backends[backend.name] = backend
+    previous_backend, app.TRANSLATION_BACKEND = app.TRANSLATION_BACKEND, backend.name
+    app.rate_limiter = app.TokenBucket(app.RATE_LIMIT_PER_MINUTE / 60.0, app.RATE_LIMIT_BURST)
+    engine = app.translation_engine
+    # Anything still unanswered this long after its deadline counts as hung
+    give_up = engine.deadline + 5.0
+    chunk_chars = 200
+    payload = "".join(f"Paragraph {i}: " + make_payload(chunk_chars - 20, seed=i) + "\n\n"
+                      for i in range(app.RATE_LIMIT_BURST + extra_chunks))
+    result = {"chunks": len(app.split_into_chunks(payload, chunk_chars))}
+
+    start = time.perf_counter()
+    future = app.ThreadPoolExecutor(max_workers=1).submit(app.translate_long_text, payload, max_chars=chunk_chars)
+    try:
+        future.result(timeout=give_up * result["chunks"])
+        result["paste_error"] = None
+    except Exception as e:
+        result["paste_error"] = f"{type(e).__name__}: {e}" if str(e) else type(e).__name__
+    result["paste_s"] = round(time.perf_counter() - start, 3)
+
+    outcomes = {"ok": 0, "failed": 0, "hung": 0}
+    interactive = []
+
+    def collect(future):
+        try:
+            future.result(timeout=give_up)
+            outcomes["ok"] += 1
+        except Exception:
+            # A request that timed out by itself is done; a hung one is not
+            outcomes["failed" if future.done() else "hung"] += 1
+
+    background_futures = [engine.submit(f"Background item {i}", backend=backend.name, priority=app.BACKGROUND)
+                          for i in range(background)]
+    for i in range(3):
+        start = time.perf_counter()
+        collect(engine.submit(f"Interactive item {i}", backend=backend.name))
+        interactive.append(time.perf_counter() - start)
+    for future in background_futures:
+        collect(future)
+    del app.translation_backends[backend.name]
+    app.TRANSLATION_BACKEND = previous_backend
+    return dict(result, background=background, outcomes=outcomes,
+                interactive=percentiles(interactive), backend_calls=backend.calls,
+                rate_limiter=app.rate_limiter.status(), breaker=backend.breaker.status(),
+                scheduler=engine.scheduler_report())
+
+def compare(previous_path, report):
+    """Print p50/p95 changes against an earlier report"""
+    with open(previous_path, encoding="utf-8") as f:
+        previous = json.load(f)
+    print(f"\nComparison with {previous_path} ({previous.get('commit')}):", file=sys.stderr)
+    old_rows = {(row["size"], row["warm"]): row for row in previous.get("latency", [])}
+    for row in report["latency"]:
+        old = old_rows.get((row["size"], row["warm"]))
+        if not old:
+            continue
+        for key in ("p50_ms", "p95_ms"):
+            change = (row[key] - old[key]) / old[key] * 100 if old[key] else 0.0
+            print(f"  size={row['size']:>8} warm={str(row['warm']):<5} {key}: "
+                  f"{old[key]:10.3f} -> {row[key]:10.3f} ({change:+.1f}%)", file=sys.stderr)
+
+def main():
+    """Run the benchmark suite and write a JSON report"""
+    parser = argparse.ArgumentParser(description="Benchmark the clipboard translation path with a fake backend.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="Payload sizes in characters")
+    parser.add_argument("--iterations", type=int, default=20, help="Iterations per payload size (fewer for large sizes)")
+    parser.add_argument("--latency-ms", type=float, default=50.0, help="Fake backend latency per request")
+    parser.add_argument("--per-char-us", type=float, default=1.0, help="Extra fake latency per character")
+    parser.add_argument("--presses", type=int, default=50, help="Presses in the concurrency scenarios")
+    parser.add_argument("--concurrency", type=int, default=8, help="Simultaneous translations")
+    parser.add_argument("--quick", action="store_true", help="Small sizes and few iterations")
+    parser.add_argument("-o", "--output", help="Write the JSON report here instead of stdout")
+    parser.add_argument("--compare", help="Earlier JSON report to compare against")
+    args = parser.parse_args()
+    if args.quick:
+        args.sizes = [size for size in args.sizes if size <= 100000]
+        args.iterations = min(args.iterations, 5)
+        args.presses = min(args.presses, 20)
+
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    import clipboard_translator_cross_platform as app
+
+    clipboard = FakeClipboard()
+    backend = make_fake_backend(app, args.latency_ms / 1000.0, args.per_char_us / 1e6)
+    app.pyperclip = clipboard
+    app.translation_backends = {"fake": backend}
+    app.TRANSLATION_BACKEND = "fake"
+
+    report = {
+        "commit": git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "settings": {"latency_ms": args.latency_ms, "per_char_us": args.per_char_us,
+                     "concurrency": args.concurrency, "presses": args.presses},
+        "latency": [],
+    }
+
+    for size in args.sizes:
+        iterations = max(1, min(args.iterations, 2000000 // size))
+        for warm in (False, True):
+            print(f"Latency: {size} chars, {'warm' if warm else 'cold'} cache, {iterations} iterations",
+                  file=sys.stderr)
+            report["latency"].append(bench_latency(app, clipboard, size, iterations, warm))
+
+    print(f"Concurrent translations: {args.presses} x 1000 chars, {args.concurrency} threads", file=sys.stderr)
+    report["concurrent"] = bench_concurrent(app, clipboard, 1000, args.presses, args.concurrency)
+    print(f"Hotkey burst: {args.presses} presses", file=sys.stderr)
+    report["hotkey_burst"] = bench_hotkey_burst(app, clipboard, args.presses, 0.005)
+    # Without --quick, the paste needs more tokens than refill within one request deadline
+    extra_chunks = 2 if args.quick else int(app.TRANSLATION_DEADLINE_SECONDS * app.RATE_LIMIT_PER_MINUTE / 60.0) + 5
+    print(f"Rate-limited network backend: burst {app.RATE_LIMIT_BURST} + {extra_chunks} chunks, "
+          f"{app.RATE_LIMIT_PER_MINUTE:g} requests/min", file=sys.stderr)
+    report["rate_limited"] = bench_rate_limited(app, args.latency_ms / 1000.0, args.per_char_us / 1e6,
+                                                extra_chunks, background=args.presses // 4)
+
+    report["backend_calls"] = backend.calls
+    report["peak_rss_bytes"] = peak_rss_bytes()
+    report["segment_memory"] = dict(app.segment_memory_stats)
+    report["detection"] = app.detection_report()
+    report["engine_latency"] = app.translation_engine.latency_report()
+    report["stages"] = app.metrics.report()
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+        print(f"Report written to {args.output}", file=sys.stderr)
+    else:
+        print(output)
+    if args.compare:
+        compare(args.compare, report)
+
+if __name__ == "__main__":
+    main()
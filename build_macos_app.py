@@ -75,7 +75,7 @@ OPTIONS = {
         'NSAccessibilityUsageDescription': 'This app needs accessibility to monitor keyboard input',
     },
     'packages': ['tkinter', 'pyperclip', 'googletrans', 'pynput', 'pync'],
-    'includes': ['tkinter', 'pyperclip', 'googletrans', 'pynput', 'pync', 'platform', 'subprocess', 'threading'],
+    'includes': ['tkinter', 'tkinter.messagebox', 'tkinter.ttk', 'asyncio', 'httpx', 'http.server', 'socketserver', 'secrets', 'pyperclip', 'googletrans', 'pynput', 'pync', 'platform', 'subprocess', 'threading'],
 }
 
 setup(
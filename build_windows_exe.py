@@ -4,6 +4,16 @@ import subprocess
 import shutil
 from pathlib import Path
 
+# Modules PyInstaller cannot find on its own: the app imports most of them
+# lazily through importlib, so they never appear in an import statement
+HIDDEN_IMPORTS = [
+    'win32api', 'win32con',
+    'tkinter', 'tkinter.messagebox', 'tkinter.ttk',
+    'pyperclip', 'googletrans', 'httpx', 'asyncio',
+    'keyboard', 'win10toast',
+    'http.server', 'socketserver', 'secrets',
+]
+
 def check_dependencies():
     """Check if required packages are installed"""
     required_packages = ['pyinstaller', 'pyperclip', 'googletrans==4.0.0-rc1', 'win10toast', 'keyboard', 'pywin32']
@@ -68,7 +78,7 @@ a = Analysis(
     pathex=[],
     binaries=[],
     datas=[('README.md', '.')],
-    hiddenimports=['win32api', 'win32con'],
+    hiddenimports=%r,
     hookspath=[],
     hooksconfig={},
     runtime_hooks=[],
@@ -103,7 +113,7 @@ exe = EXE(
     entitlements_file=None,
     icon='icon.ico' if os.path.exists('icon.ico') else None,
 )
-    """
+    """ % HIDDEN_IMPORTS
     
     # Write spec file
     with open("clipboard_translator.spec", "w") as f:
@@ -124,9 +134,8 @@ exe = EXE(
             '--onefile',
             '--windowed',  # No console window
             '--clean',
-            '--hidden-import=win32api',
-            '--hidden-import=win32con',
         ]
+        pyinstaller_command += [f'--hidden-import={module}' for module in HIDDEN_IMPORTS]
         
         if icon_path:
             pyinstaller_command.append(icon_path)
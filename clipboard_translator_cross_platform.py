@@ -1,20 +1,67 @@
-import tkinter as tk
-from tkinter import messagebox  # Import messagebox explicitly
-import pyperclip
-from googletrans import Translator
+import time
+# Reference point for the --startup-timing report
+STARTUP_T0 = time.perf_counter()
 import threading
 import sys
+import os
 import platform
+import hashlib
+import sqlite3
+import mmap
+import zlib
+import struct
+import unicodedata
+import queue
+import re
+import random
+import argparse
+import json
+import importlib
+import subprocess
+from concurrent.futures import ThreadPoolExecutor, Future, TimeoutError as FutureTimeoutError
+from collections import OrderedDict, deque, Counter
+from contextlib import contextmanager
+
+# Startup milestones and deferred import durations for --startup-timing
+startup_timings = []
+
+def record_startup_event(kind, name, start=None):
+    now = time.perf_counter()
+    startup_timings.append((kind, name, (now - STARTUP_T0) * 1000,
+                            (now - start) * 1000 if start is not None else None))
+
+def timed_import(name):
+    start = time.perf_counter()
+    module = importlib.import_module(name)
+    record_startup_event("import", name, start)
+    return module
+
+# Module proxy that imports on first attribute access, so heavy dependencies
+# (tkinter, pyperclip, googletrans/httpx, asyncio) stay out of the startup path
+class LazyModule:
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+
+    def __getattr__(self, attr):
+        if self._module is None:
+            self._module = timed_import(self._name)
+        return getattr(self._module, attr)
+
+tk = LazyModule("tkinter")
+messagebox = LazyModule("tkinter.messagebox")
+ttk = LazyModule("tkinter.ttk")
+pyperclip = LazyModule("pyperclip")
+asyncio = LazyModule("asyncio")
 
 # Detect operating system
 OS_SYSTEM = platform.system()
 
 # Platform-specific imports
 if OS_SYSTEM == "Windows":
-    import keyboard
-    from win10toast import ToastNotifier
-    # Initialize Windows notifier
-    toaster = ToastNotifier()
+    keyboard = LazyModule("keyboard")
+    # Windows notifier is created on first use
+    toaster = None
     HOTKEY = 'ctrl+j'
     HOTKEY_DISPLAY = "Ctrl+J"
     
@@ -22,7 +69,6 @@ elif OS_SYSTEM == "Darwin":  # macOS
     # Use a try/except to handle potential import issues
     try:
         import pynput.keyboard as pynput_keyboard
-        import subprocess
         from pync import Notifier
         import os.path
         # Set flag for pynput availability
@@ -46,10 +92,212 @@ else:
 # Global variables
 keybind_active = True
 
-# Function to show notifications based on platform
-# Show notification
-def show_notification(title, message, duration=3):
+# Set by --startup-timing
+startup_timing_requested = False
+
+# Local endpoint served by this process, if any
+translation_server = None
+
+# Per-user data directory (translation cache, etc.)
+if OS_SYSTEM == "Windows":
+    APP_DATA_DIR = os.path.join(os.environ.get("APPDATA", os.path.expanduser("~")), "ClipboardJapaneseTranslator")
+elif OS_SYSTEM == "Darwin":
+    APP_DATA_DIR = os.path.expanduser("~/Library/Application Support/Clipboard Japanese Translator")
+else:
+    APP_DATA_DIR = os.path.join(os.environ.get("XDG_CACHE_HOME", os.path.expanduser("~/.cache")), "clipboard-japanese-translator")
+
+# Translation cache settings (can be overridden with environment variables)
+CACHE_PATH = os.environ.get("CJT_CACHE_PATH", os.path.join(APP_DATA_DIR, "translation_cache.sqlite3"))
+CACHE_MEMORY_ENTRIES = int(os.environ.get("CJT_CACHE_MEMORY_ENTRIES", "512"))
+CACHE_DISK_ENTRIES = int(os.environ.get("CJT_CACHE_DISK_ENTRIES", "50000"))
+CACHE_MAX_AGE_SECONDS = float(os.environ.get("CJT_CACHE_MAX_AGE_DAYS", "30")) * 24 * 3600
+
+# Translation history: the newest entries are kept in memory (bounded by count and
+# size), older ones are spilled in compressed blocks to an append-only log. "" disables the log.
+HISTORY_PATH = os.environ.get("CJT_HISTORY_PATH", os.path.join(APP_DATA_DIR, "history.log"))
+HISTORY_MEMORY_ENTRIES = int(os.environ.get("CJT_HISTORY_MEMORY_ENTRIES", "200"))
+HISTORY_MEMORY_CHARS = 2000000
+HISTORY_SPILL_BLOCK = 64
+HISTORY_MAX_BYTES = 64 * 1024 * 1024
+# Full-text search over the history: an SQLite FTS5 trigram index of source and
+# translation ("" keeps the index in memory only)
+HISTORY_INDEX_PATH = os.environ.get("CJT_HISTORY_INDEX_PATH", os.path.join(APP_DATA_DIR, "history_index.sqlite3"))
+HISTORY_INDEX_MAX_ENTRIES = int(os.environ.get("CJT_HISTORY_INDEX_MAX_ENTRIES", "100000"))
+SEARCH_RESULT_LIMIT = 50
+# Search terms the trigram index can't answer (under three characters) are only
+# looked for in this many of the newest entries
+SEARCH_SCAN_ROWS = int(os.environ.get("CJT_SEARCH_SCAN_ROWS", "5000"))
+SEARCH_DEBOUNCE_MS = 15
+
+# Translation worker settings
+TRANSLATION_WORKERS = int(os.environ.get("CJT_TRANSLATION_WORKERS", "1"))
+TRANSLATION_QUEUE_SIZE = int(os.environ.get("CJT_TRANSLATION_QUEUE_SIZE", "8"))
+# Latest wins: a new hotkey press supersedes older requests, which are dropped
+# from the queue or abandoned in flight without touching the clipboard or window
+LATEST_WINS = os.environ.get("CJT_LATEST_WINS", "1") == "1"
+# How often a translation waiting on the backend checks whether it is still wanted
+CANCEL_POLL_SECONDS = 0.05
+
+# Translation backend: "auto" (Google, falling back to the local engine when
+# offline), "google" or "local"
+TRANSLATION_BACKEND = os.environ.get("CJT_BACKEND", "auto").lower()
+# Source language assumed by the local engine when the source is "auto"
+LOCAL_SOURCE_LANGUAGE = os.environ.get("CJT_LOCAL_SOURCE_LANGUAGE", "en")
+# How long to route around a backend after it fails (seconds)
+BACKEND_RETRY_SECONDS = 30
+
+# Client-side limits for network backends: a token bucket shared by every
+# translation path, and a circuit breaker that pauses a backend after a burst of
+# 429/5xx/connection failures, then lets a probe request through after a cooldown
+RATE_LIMIT_PER_MINUTE = float(os.environ.get("CJT_RATE_LIMIT_PER_MINUTE", "60"))
+RATE_LIMIT_BURST = int(os.environ.get("CJT_RATE_LIMIT_BURST", "10"))
+# How long a call waits for a token when the caller has no deadline of its own.
+# Engine requests wait up to their remaining deadline instead.
+RATE_LIMIT_MAX_WAIT_SECONDS = 2.0
+BREAKER_FAILURE_THRESHOLD = 5
+BREAKER_WINDOW_SECONDS = 30.0
+BREAKER_COOLDOWN_SECONDS = 30.0
+BREAKER_MAX_COOLDOWN_SECONDS = 300.0
+
+# Languages to translate into (comma-separated codes). The first one is copied to
+# the clipboard; with several, all of them are translated concurrently and each
+# gets its own tab in the window.
+TARGET_LANGUAGES = list(OrderedDict.fromkeys(
+    code.strip().lower() for code in os.environ.get("CJT_TARGET_LANGUAGES", "ja").split(",") if code.strip())) or ["ja"]
+LANGUAGE_NAMES = {
+    "ja": "Japanese", "zh-cn": "Chinese (Simplified)", "zh-tw": "Chinese (Traditional)", "ko": "Korean",
+    "en": "English", "fr": "French", "de": "German", "es": "Spanish", "it": "Italian", "pt": "Portuguese",
+    "ru": "Russian", "vi": "Vietnamese", "th": "Thai", "id": "Indonesian",
+}
+
+# Detect the source language locally and skip translations that would change
+# nothing (text already in the target language, numbers, URLs, code)
+LOCAL_DETECTION = os.environ.get("CJT_LOCAL_DETECTION", "1") == "1"
+
+# Large clipboard payloads are split into chunks translated in parallel
+CHUNK_MAX_CHARS = int(os.environ.get("CJT_CHUNK_MAX_CHARS", "4500"))
+# Micro-batching: short single-line texts translated at about the same time (CLI
+# jobs, multi-target fan-out, prefetch) are packed newline-joined into one backend
+# request. A batch waits at most CJT_BATCH_WINDOW_MS for company (0 disables
+# batching) and holds up to CJT_BATCH_MAX_CHARS characters.
+BATCH_WINDOW_SECONDS = float(os.environ.get("CJT_BATCH_WINDOW_MS", "5")) / 1000.0
+BATCH_MAX_CHARS = int(os.environ.get("CJT_BATCH_MAX_CHARS", str(CHUNK_MAX_CHARS)))
+BATCH_MAX_ITEMS = 100
+# Translation engine settings: concurrent requests, per-request deadline,
+# per-attempt network timeout and retries on transient errors
+TRANSLATION_CONCURRENCY = int(os.environ.get("CJT_TRANSLATION_CONCURRENCY", "4"))
+TRANSLATION_DEADLINE_SECONDS = float(os.environ.get("CJT_TRANSLATION_DEADLINE", "30"))
+TRANSLATION_TIMEOUT_SECONDS = float(os.environ.get("CJT_TRANSLATION_TIMEOUT", "10"))
+TRANSLATION_RETRIES = int(os.environ.get("CJT_TRANSLATION_RETRIES", "3"))
+RETRY_BACKOFF_BASE_SECONDS = 0.5
+RETRY_BACKOFF_MAX_SECONDS = 8.0
+# Priority classes of translation requests. Hotkey and button presses are
+# interactive; prefetch and batch jobs are background work. Interactive requests
+# are served first and have CJT_INTERACTIVE_SLOTS of the concurrent backend calls
+# to themselves. Background work also holds back once the request budget is down
+# to BACKGROUND_RESERVED_TOKENS, leaving the rest to interactive requests. The
+# reserve never takes the whole bucket, so a burst of 1 reserves nothing.
+INTERACTIVE = "interactive"
+BACKGROUND = "background"
+PRIORITIES = (INTERACTIVE, BACKGROUND)
+INTERACTIVE_SLOTS = int(os.environ.get("CJT_INTERACTIVE_SLOTS", "1"))
+BACKGROUND_RESERVED_TOKENS = max(0, min(max(1, RATE_LIMIT_BURST // 2), RATE_LIMIT_BURST - 1))
+
+# Reuse cached translations of individual sentences, so editing one sentence of
+# a long text only sends that sentence to the backend. Texts shorter than
+# SEGMENT_MEMORY_MIN_CHARS are always sent whole, keeping their full context.
+SEGMENT_MEMORY = os.environ.get("CJT_SEGMENT_MEMORY", "1") == "1"
+SEGMENT_MEMORY_MIN_CHARS = int(os.environ.get("CJT_SEGMENT_MEMORY_MIN_CHARS", "2000"))
+
+# Show chunked translations segment by segment as they complete
+STREAM_RESULTS = os.environ.get("CJT_STREAM_RESULTS", "1") == "1"
+# Also put the partial translation on the clipboard after each segment
+STREAM_TO_CLIPBOARD = os.environ.get("CJT_STREAM_TO_CLIPBOARD", "0") == "1"
+
+# Clipboard watch mode: translate new clipboard content in the background so the
+# hotkey can answer from the cache
+WATCH_CLIPBOARD = os.environ.get("CJT_WATCH_CLIPBOARD", "0") == "1"
+WATCH_MIN_INTERVAL_SECONDS = 0.25
+WATCH_MAX_INTERVAL_SECONDS = 2.0
+WATCH_DEBOUNCE_SECONDS = 0.3
+WATCH_MAX_CHARS = int(os.environ.get("CJT_WATCH_MAX_CHARS", "20000"))
+
+# Local IPC endpoint shared by the GUI, the headless daemon and their clients.
+# Port 0 picks a free port; the chosen port and access token are written to DAEMON_STATE_PATH.
+DAEMON_HOST = "127.0.0.1"
+DAEMON_PORT = int(os.environ.get("CJT_DAEMON_PORT", "0"))
+DAEMON_STATE_PATH = os.path.join(APP_DATA_DIR, "daemon.json")
+
+# Per-stage latency metrics: rolling window for percentiles, a JSON line per
+# request in METRICS_LOG_PATH ("" disables) and an optional Prometheus text file
+METRICS_WINDOW = int(os.environ.get("CJT_METRICS_WINDOW", "200"))
+METRICS_LOG_PATH = os.environ.get("CJT_METRICS_LOG", os.path.join(APP_DATA_DIR, "metrics.log"))
+METRICS_LOG_MAX_BYTES = 5 * 1024 * 1024
+PROMETHEUS_FILE = os.environ.get("CJT_PROMETHEUS_FILE", "")
+METRICS_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Notification dispatcher: bursts arriving within NOTIFICATION_COALESCE_SECONDS are
+# merged into one summary toast, and toasts are at least NOTIFICATION_MIN_INTERVAL_SECONDS apart
+NOTIFICATION_COALESCE_SECONDS = 0.3
+NOTIFICATION_MIN_INTERVAL_SECONDS = float(os.environ.get("CJT_NOTIFICATION_MIN_INTERVAL", "1.0"))
+
+# How often the Tk main loop drains UI updates posted by background threads (ms)
+UI_POLL_INTERVAL_MS = 50
+
+# Text panes hold at most DISPLAY_PAGE_CHARS per page shown (the rest is paged in
+# on request) and insert it in slices between Tk events, so huge clipboards keep
+# the window responsive. Texts over DISPLAY_NO_WRAP_CHARS are shown unwrapped.
+DISPLAY_PAGE_CHARS = int(os.environ.get("CJT_DISPLAY_PAGE_CHARS", "200000"))
+DISPLAY_SLICE_CHARS = 16384
+DISPLAY_SLICE_BUDGET_SECONDS = 0.008
+DISPLAY_NO_WRAP_CHARS = 100000
+
+# Long-lived osascript process for macOS notifications. Reusing one JavaScript
+# session avoids forking a new interpreter for every toast.
+class MacScriptChannel:
+    def __init__(self):
+        self._process = None
+
+    def _start(self):
+        self._process = subprocess.Popen(
+            ["osascript", "-il", "JavaScript"],
+            stdin=subprocess.PIPE, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+            universal_newlines=True, bufsize=1)
+        self._process.stdin.write("var app = Application.currentApplication(); app.includeStandardAdditions = true;\n")
+
+    def notify(self, title, message):
+        # JSON string literals are valid JavaScript, which takes care of quoting
+        line = f"app.displayNotification({json.dumps(message)}, {{withTitle: {json.dumps(title)}}});\n"
+        for attempt in range(2):
+            try:
+                if self._process is None or self._process.poll() is not None:
+                    self._start()
+                self._process.stdin.write(line)
+                self._process.stdin.flush()
+                return
+            except OSError:
+                self.close()
+        # The interactive session isn't usable; fall back to a one-off process
+        script = f"display notification {json.dumps(message)} with title {json.dumps(title)}"
+        subprocess.run(["osascript", "-e", script], capture_output=True)
+
+    def close(self):
+        process, self._process = self._process, None
+        if process is not None:
+            try:
+                process.stdin.close()
+                process.wait(timeout=1)
+            except Exception:
+                process.kill()
+
+mac_script_channel = MacScriptChannel()
+
+# Function to show notifications based on platform (runs on the dispatcher thread)
+def deliver_notification(title, message, duration=3):
     if OS_SYSTEM == "Windows":
+        global toaster
+        if toaster is None:
+            toaster = timed_import("win10toast").ToastNotifier()
         toaster.show_toast(title, message, duration=duration, threaded=True)
     elif OS_SYSTEM == "Darwin":
         try:
@@ -58,8 +306,7 @@ def show_notification(title, message, duration=3):
                 Notifier.notify(message, title=title)
             else:
                 # Use applescript as fallback for notifications
-                script = f'display notification "{message}" with title "{title}"'
-                subprocess.run(["osascript", "-e", script], capture_output=True)
+                mac_script_channel.notify(title, message)
         except Exception as e:
             print(f"Mac notification error: {e}")
             # Last resort fallback - print to console
@@ -68,60 +315,2696 @@ def show_notification(title, message, duration=3):
         # Fallback for other platforms - print to console
         print(f"{title}: {message}")
 
-# Core translation function
-def translate_clipboard(show_notification_flag=True):
-    # Get text from clipboard
-    clipboard_text = pyperclip.paste()
+# Delivers notifications on a background thread so they never hold up a
+# translation. Bursts are coalesced into one summary toast and rate-limited.
+class NotificationDispatcher:
+    def __init__(self, coalesce=NOTIFICATION_COALESCE_SECONDS, min_interval=NOTIFICATION_MIN_INTERVAL_SECONDS):
+        self.coalesce = coalesce
+        self.min_interval = min_interval
+        self.submitted = 0
+        self.delivered = 0
+        self.coalesced = 0
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+        self._last_delivery = 0.0
+
+    def notify(self, title, message, duration=3):
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name="notifications", daemon=True)
+                    self._thread.start()
+        self.submitted += 1
+        self._queue.put((title, message, duration))
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            if batch[0] is None:
+                return
+            # Collect the rest of the burst, and wait out the rate limit
+            deadline = max(time.monotonic() + self.coalesce, self._last_delivery + self.min_interval)
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is None:
+                    return
+                batch.append(item)
+
+            title, message, duration = batch[-1]
+            if len(batch) > 1:
+                self.coalesced += len(batch) - 1
+                errors = sum(1 for item in batch if item[0] == "Translation Error")
+                title = f"{len(batch)} notifications"
+                if errors:
+                    title += f" ({errors} errors)"
+                message = f"Latest: {message}"
+            try:
+                deliver_notification(title, message, duration)
+            except Exception as e:
+                print(f"Notification error: {e}")
+            self.delivered += 1
+            self._last_delivery = time.monotonic()
+
+    def stop(self):
+        if self._thread is not None:
+            self._queue.put(None)
+        mac_script_channel.close()
+
+    def stats(self):
+        return {"submitted": self.submitted, "delivered": self.delivered, "coalesced": self.coalesced}
+
+notification_dispatcher = NotificationDispatcher()
+
+# Show notification (returns immediately; delivery happens in the background)
+def show_notification(title, message, duration=3):
+    notification_dispatcher.notify(title, message, duration)
+
+# Two-tier translation cache: a small in-memory LRU in front of a SQLite store.
+# Entries are keyed by a hash of the normalized text plus the language pair, so
+# repeated translations come back without a network call and survive restarts.
+class TranslationCache:
+    def __init__(self, path=CACHE_PATH, memory_entries=CACHE_MEMORY_ENTRIES,
+                 disk_entries=CACHE_DISK_ENTRIES, max_age=CACHE_MAX_AGE_SECONDS):
+        self.path = path
+        self.memory_entries = memory_entries
+        self.disk_entries = disk_entries
+        self.max_age = max_age
+        self.hits = 0
+        self.memory_hits = 0
+        self.misses = 0
+        self._memory = OrderedDict()  # key -> (translated_text, created_at)
+        self._lock = threading.Lock()
+        self._db = None
+        self._db_opened = False
+        self._writes_since_prune = 0
+
+    # Open the disk store on first use (called with the lock held)
+    def _connect(self):
+        if self._db_opened:
+            return self._db
+        self._db_opened = True
+        if self.path:
+            try:
+                os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+                self._db = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+                self._db.execute("PRAGMA journal_mode=WAL")
+                self._db.execute("PRAGMA synchronous=NORMAL")
+                self._db.execute(
+                    "CREATE TABLE IF NOT EXISTS translations ("
+                    "key TEXT PRIMARY KEY, src TEXT, dest TEXT, translated TEXT, "
+                    "created REAL, last_used REAL)")
+                self._db.execute("CREATE INDEX IF NOT EXISTS idx_translations_last_used ON translations(last_used)")
+                self._prune_locked()
+            except Exception as e:
+                # Fall back to a memory-only cache if the disk store is unusable
+                print(f"Translation cache disabled on disk ({self.path}): {e}")
+                self._db = None
+        return self._db
+
+    def open(self):
+        with self._lock:
+            return self._connect() is not None
+
+    @staticmethod
+    def normalize(text):
+        return unicodedata.normalize("NFC", text).strip()
+
+    @classmethod
+    def make_key(cls, text, src, dest):
+        payload = f"{src}\0{dest}\0{cls.normalize(text)}"
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _expired(self, created, now):
+        return self.max_age > 0 and now - created > self.max_age
+
+    def _remember(self, key, translated, created):
+        self._memory[key] = (translated, created)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def get(self, text, src="auto", dest="ja"):
+        key = self.make_key(text, src, dest)
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                if not self._expired(entry[1], now):
+                    self._memory.move_to_end(key)
+                    self.hits += 1
+                    self.memory_hits += 1
+                    return entry[0]
+                del self._memory[key]
+
+            if self._connect() is not None:
+                try:
+                    row = self._db.execute(
+                        "SELECT translated, created FROM translations WHERE key = ?", (key,)).fetchone()
+                    if row is not None:
+                        if not self._expired(row[1], now):
+                            self._db.execute("UPDATE translations SET last_used = ? WHERE key = ?", (now, key))
+                            self._remember(key, row[0], row[1])
+                            self.hits += 1
+                            return row[0]
+                        self._db.execute("DELETE FROM translations WHERE key = ?", (key,))
+                except sqlite3.Error as e:
+                    print(f"Translation cache read error: {e}")
+
+            self.misses += 1
+            return None
+
+    def put(self, text, translated, src="auto", dest="ja"):
+        key = self.make_key(text, src, dest)
+        now = time.time()
+        with self._lock:
+            self._remember(key, translated, now)
+            if self._connect() is not None:
+                try:
+                    self._db.execute(
+                        "INSERT OR REPLACE INTO translations (key, src, dest, translated, created, last_used) "
+                        "VALUES (?, ?, ?, ?, ?, ?)", (key, src, dest, translated, now, now))
+                    self._writes_since_prune += 1
+                except sqlite3.Error as e:
+                    print(f"Translation cache write error: {e}")
+        if self._writes_since_prune >= 100:
+            self.prune()
+
+    # Drop entries that are too old, then the least recently used beyond the size limit
+    def prune(self):
+        with self._lock:
+            if self._connect() is not None:
+                self._prune_locked()
+
+    def _prune_locked(self):
+        self._writes_since_prune = 0
+        if self._db is not None:
+            try:
+                if self.max_age > 0:
+                    self._db.execute("DELETE FROM translations WHERE created < ?", (time.time() - self.max_age,))
+                count = self._db.execute("SELECT COUNT(*) FROM translations").fetchone()[0]
+                if count > self.disk_entries:
+                    self._db.execute(
+                        "DELETE FROM translations WHERE key IN ("
+                        "SELECT key FROM translations ORDER BY last_used ASC LIMIT ?)",
+                        (count - self.disk_entries,))
+            except sqlite3.Error as e:
+                print(f"Translation cache prune error: {e}")
+
+    def stats(self):
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "memory_hits": self.memory_hits,
+                "misses": self.misses,
+                "memory_entries": len(self._memory),
+            }
+
+    def close(self):
+        with self._lock:
+            if self._db is not None:
+                try:
+                    self._db.close()
+                except sqlite3.Error:
+                    pass
+                self._db = None
+
+translation_cache = TranslationCache()
+
+# One translation in the history. Language codes are interned so thousands of
+# entries share a handful of strings.
+class HistoryEntry:
+    __slots__ = ("timestamp", "src", "dest", "source", "translation")
+
+    def __init__(self, timestamp, src, dest, source, translation):
+        self.timestamp = timestamp
+        self.src = sys.intern(src)
+        self.dest = sys.intern(dest)
+        self.source = source
+        self.translation = translation
+
+    def chars(self):
+        return len(self.source) + len(self.translation)
+
+# Log block header: compressed payload length and number of entries
+_HISTORY_BLOCK_HEADER = struct.Struct("<II")
+
+# Translation history. The newest entries live in a ring bounded by count and
+# total size; when it overflows, the oldest entries are spilled as one
+# zlib-compressed block to an append-only log. The log is memory-mapped for
+# reads, so looking back through it costs no memory beyond the block being read.
+class TranslationHistory:
+    def __init__(self, path=HISTORY_PATH, memory_entries=HISTORY_MEMORY_ENTRIES,
+                 memory_chars=HISTORY_MEMORY_CHARS, spill_block=HISTORY_SPILL_BLOCK):
+        self.path = path
+        self.memory_entries = max(1, memory_entries)
+        self.memory_chars = memory_chars
+        self.spill_block = max(1, spill_block)
+        self.added = 0
+        self._recent = deque()  # Oldest first
+        self._recent_chars = 0
+        self._blocks = []  # (offset, payload length, entry count) in log order
+        self._log_size = 0
+        self._file = None
+        self._map = None
+        self._mapped_size = 0
+        self._opened = False
+        self._rotations = 0  # Block offsets from before a rotation point into the old log
+        self._lock = threading.Lock()
+
+    # Open the log on first use and index its blocks (called with the lock held)
+    def _open(self):
+        if self._opened:
+            return self._file
+        self._opened = True
+        if self.path:
+            try:
+                os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+                if os.path.exists(self.path) and os.path.getsize(self.path) > HISTORY_MAX_BYTES:
+                    os.replace(self.path, self.path + ".1")
+                self._file = open(self.path, "a+b")
+                self._index_blocks()
+            except (OSError, struct.error) as e:
+                print(f"Translation history disabled on disk ({self.path}): {e}")
+                self._file = None
+        return self._file
+
+    def _index_blocks(self):
+        size = os.fstat(self._file.fileno()).st_size
+        offset = 0
+        self._file.seek(0)
+        while offset + _HISTORY_BLOCK_HEADER.size <= size:
+            length, count = _HISTORY_BLOCK_HEADER.unpack(self._file.read(_HISTORY_BLOCK_HEADER.size))
+            if offset + _HISTORY_BLOCK_HEADER.size + length > size:
+                break
+            self._blocks.append((offset, length, count))
+            offset += _HISTORY_BLOCK_HEADER.size + length
+            self._file.seek(offset)
+        if offset < size:
+            # Drop a block left half-written by a crash
+            self._file.truncate(offset)
+        self._log_size = offset
+
+    # Returns the new entry, or None if it repeats a recent one
+    def add(self, source, translation, src="auto", dest="ja"):
+        entry = HistoryEntry(time.time(), src, dest, source, translation)
+        with self._lock:
+            # Pressing the hotkey again on the same text doesn't add a new entry
+            for index, recent in enumerate(reversed(self._recent)):
+                if index >= 8:
+                    break
+                if recent.dest == dest and recent.source == source and recent.translation == translation:
+                    return None
+            self._recent.append(entry)
+            self._recent_chars += entry.chars()
+            self.added += 1
+            if len(self._recent) > self.memory_entries or self._recent_chars > self.memory_chars:
+                spilled = []
+                while len(self._recent) > 1 and (len(spilled) < self.spill_block or
+                                                 self._recent_chars > self.memory_chars):
+                    spilled.append(self._recent.popleft())
+                    self._recent_chars -= spilled[-1].chars()
+                self._spill(spilled)
+        return entry
+
+    # Move a log past HISTORY_MAX_BYTES aside to <path>.1 and start a new one
+    # (called with the lock held)
+    def _rotate(self):
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+            self._mapped_size = 0
+        self._file.close()
+        self._file = None
+        self._blocks = []
+        self._log_size = 0
+        self._rotations += 1
+        try:
+            os.replace(self.path, self.path + ".1")
+        except OSError as e:
+            print(f"Translation history rotation failed ({self.path}): {e}")
+        try:
+            self._file = open(self.path, "a+b")
+            self._index_blocks()
+        except (OSError, struct.error) as e:
+            print(f"Translation history disabled on disk ({self.path}): {e}")
+            self._file = None
+
+    # Append entries to the log as one block (called with the lock held)
+    def _spill(self, entries):
+        if not entries or self._open() is None:
+            return
+        if self._log_size > HISTORY_MAX_BYTES:
+            self._rotate()
+            if self._file is None:
+                return
+        records = [[entry.timestamp, entry.src, entry.dest, entry.source, entry.translation] for entry in entries]
+        payload = zlib.compress(json.dumps(records, ensure_ascii=False).encode("utf-8", "surrogatepass"))
+        try:
+            self._file.seek(0, os.SEEK_END)
+            self._file.write(_HISTORY_BLOCK_HEADER.pack(len(payload), len(entries)) + payload)
+            self._file.flush()
+        except OSError as e:
+            print(f"Translation history write error: {e}")
+            return
+        self._blocks.append((self._log_size, len(payload), len(entries)))
+        self._log_size += _HISTORY_BLOCK_HEADER.size + len(payload)
+
+    # Entries of one log block, oldest first (called with the lock held)
+    def _read_block(self, block):
+        if self._map is None or self._mapped_size != self._log_size:
+            if self._map is not None:
+                self._map.close()
+            self._map = mmap.mmap(self._file.fileno(), self._log_size, access=mmap.ACCESS_READ)
+            self._mapped_size = self._log_size
+        offset, length, count = block
+        start = offset + _HISTORY_BLOCK_HEADER.size
+        records = json.loads(zlib.decompress(self._map[start:start + length]).decode("utf-8", "surrogatepass"))
+        return [HistoryEntry(*record) for record in records]
+
+    # Entries from newest to oldest, in memory first and then from the log
+    def iter_newest(self):
+        with self._lock:
+            recent = list(self._recent)
+            self._open()
+            blocks = list(self._blocks)
+            rotations = self._rotations
+        for entry in reversed(recent):
+            yield entry
+        for block in reversed(blocks):
+            try:
+                with self._lock:
+                    if self._rotations != rotations:
+                        return  # The rest of these blocks were moved to the old log
+                    entries = self._read_block(block)
+            except (OSError, ValueError, zlib.error) as e:
+                print(f"Translation history read error: {e}")
+                return
+            for entry in reversed(entries):
+                yield entry
+
+    # The index-th newest entry translated into `dest` (0 is the latest one)
+    def nth(self, index, dest=None):
+        for entry in self.iter_newest():
+            if dest is None or entry.dest == dest:
+                if index == 0:
+                    return entry
+                index -= 1
+        return None
+
+    def stats(self):
+        with self._lock:
+            return {
+                "memory_entries": len(self._recent),
+                "memory_chars": self._recent_chars,
+                "log_entries": sum(block[2] for block in self._blocks),
+                "log_bytes": self._log_size,
+            }
+
+    # Spill what is still in memory so the next session can see it
+    def close(self):
+        with self._lock:
+            self._spill(list(self._recent))
+            self._recent.clear()
+            self._recent_chars = 0
+            if self._map is not None:
+                self._map.close()
+                self._map = None
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+translation_history = TranslationHistory()
+
+# Full-text search over source and translated text of the history, updated as
+# translations complete. An FTS5 trigram index finds any substring of three or
+# more characters, which works for Japanese and Chinese text without word
+# breaks; shorter terms fall back to a LIKE scan of the newest entries. New
+# entries are inserted by a writer thread, off the translation's critical path.
+class HistorySearchIndex:
+    def __init__(self, path=HISTORY_INDEX_PATH, max_entries=HISTORY_INDEX_MAX_ENTRIES):
+        self.path = path
+        self.max_entries = max_entries
+        self.trigram = False
+        self.queries = 0
+        self.total_query_time = 0.0
+        self.max_query_time = 0.0
+        self._db = None
+        self._db_opened = False
+        self._writes_since_prune = 0
+        self._lock = threading.Lock()
+        self._pending = queue.Queue()
+        self._writer = None
+        self._writer_lock = threading.Lock()
+
+    # Open the index on first use (called with the lock held). Falls back to an
+    # in-memory index if the file is unusable.
+    def _connect(self):
+        if self._db_opened:
+            return self._db
+        self._db_opened = True
+        for path in ([self.path] if self.path else []) + [":memory:"]:
+            try:
+                if path != ":memory:":
+                    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+                db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+                db.execute("PRAGMA journal_mode=WAL")
+                db.execute("PRAGMA synchronous=NORMAL")
+                try:
+                    db.execute("CREATE VIRTUAL TABLE IF NOT EXISTS history_search USING fts5("
+                               "source, translation, src UNINDEXED, dest UNINDEXED, timestamp UNINDEXED, "
+                               "tokenize='trigram')")
+                except sqlite3.OperationalError:
+                    # SQLite before 3.34 has no trigram tokenizer; every search is a scan then
+                    db.execute("CREATE TABLE IF NOT EXISTS history_search ("
+                               "source TEXT, translation TEXT, src TEXT, dest TEXT, timestamp REAL)")
+                schema = db.execute("SELECT sql FROM sqlite_master WHERE name = 'history_search'").fetchone()[0]
+                self.trigram = "trigram" in schema.lower()
+                self._db = db
+                break
+            except (OSError, sqlite3.Error) as e:
+                print(f"History search index unavailable ({path}): {e}")
+        return self._db
+
+    def open(self):
+        with self._lock:
+            return self._connect() is not None
+
+    # Queue an entry for indexing; it becomes searchable once the writer has inserted it
+    def add(self, entry):
+        if self._writer is None:
+            with self._writer_lock:
+                if self._writer is None:
+                    self._writer = threading.Thread(target=self._run, name="history-index", daemon=True)
+                    self._writer.start()
+        self._pending.put(entry)
+
+    # Insert queued entries, a burst at a time in one transaction
+    def _run(self):
+        while True:
+            entries = [self._pending.get()]
+            while len(entries) < 100:
+                try:
+                    entries.append(self._pending.get_nowait())
+                except queue.Empty:
+                    break
+            stopping = None in entries
+            self._insert([entry for entry in entries if entry is not None])
+            if stopping:
+                return
+
+    def _insert(self, entries):
+        if not entries:
+            return
+        with self._lock:
+            if self._connect() is None:
+                return
+            try:
+                self._db.execute("BEGIN")
+                self._db.executemany(
+                    "INSERT INTO history_search (source, translation, src, dest, timestamp) VALUES (?, ?, ?, ?, ?)",
+                    [(entry.source, entry.translation, entry.src, entry.dest, entry.timestamp) for entry in entries])
+                self._db.execute("COMMIT")
+                self._writes_since_prune += len(entries)
+                if self._writes_since_prune >= 500:
+                    self._prune_locked()
+            except sqlite3.Error as e:
+                print(f"History search index write error: {e}")
+                if self._db.in_transaction:
+                    self._db.execute("ROLLBACK")
+
+    # Keep only the newest max_entries rows (called with the lock held)
+    def _prune_locked(self):
+        self._writes_since_prune = 0
+        self._db.execute("DELETE FROM history_search WHERE rowid <= "
+                         "(SELECT MAX(rowid) FROM history_search) - ?", (self.max_entries,))
+
+    # Index the history written before the index existed (or after it was deleted)
+    def backfill(self, history):
+        with self._lock:
+            if self._connect() is None:
+                return 0
+            try:
+                if self._db.execute("SELECT rowid FROM history_search LIMIT 1").fetchone() is not None:
+                    return 0
+                entries = []
+                for entry in history.iter_newest():
+                    entries.append(entry)
+                    if len(entries) >= self.max_entries:
+                        break
+                self._db.execute("BEGIN")
+                self._db.executemany(
+                    "INSERT INTO history_search (source, translation, src, dest, timestamp) VALUES (?, ?, ?, ?, ?)",
+                    [(entry.source, entry.translation, entry.src, entry.dest, entry.timestamp)
+                     for entry in reversed(entries)])
+                self._db.execute("COMMIT")
+                return len(entries)
+            except sqlite3.Error as e:
+                print(f"History search index backfill error: {e}")
+                if self._db.in_transaction:
+                    self._db.execute("ROLLBACK")
+                return 0
+
+    # Newest entries containing every whitespace-separated term of `query`, in
+    # either the source or the translation (case-insensitive for Latin letters).
+    # Terms the index can't answer are only looked for in the newest `scan_rows` entries.
+    def search(self, query, limit=SEARCH_RESULT_LIMIT, scan_rows=SEARCH_SCAN_ROWS):
+        terms = unicodedata.normalize("NFC", query).split()
+        if not terms or not self.open():
+            return []
+        started = time.perf_counter()
+        indexed = [term for term in terms if len(term) >= 3] if self.trigram else []
+        conditions = []
+        params = []
+        if indexed:
+            conditions.append("history_search MATCH ?")
+            params.append(" ".join('"' + term.replace('"', '""') + '"' for term in indexed))
+        if scan_rows and len(indexed) < len(terms):
+            conditions.append("rowid > (SELECT MAX(rowid) FROM history_search) - ?")
+            params.append(scan_rows)
+        for term in terms:
+            if term not in indexed:
+                pattern = "%" + term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+                conditions.append("(source LIKE ? ESCAPE '\\' OR translation LIKE ? ESCAPE '\\')")
+                params.extend((pattern, pattern))
+        sql = ("SELECT timestamp, src, dest, source, translation FROM history_search WHERE "
+               + " AND ".join(conditions) + " ORDER BY rowid DESC LIMIT ?")
+        with self._lock:
+            if self._db is None:
+                return []
+            try:
+                rows = self._db.execute(sql, params + [limit]).fetchall()
+            except sqlite3.Error as e:
+                print(f"History search error: {e}")
+                return []
+            elapsed = time.perf_counter() - started
+            self.queries += 1
+            self.total_query_time += elapsed
+            self.max_query_time = max(self.max_query_time, elapsed)
+        return [HistoryEntry(*row) for row in rows]
+
+    def stats(self):
+        with self._lock:
+            entries = 0
+            if self._db is not None:
+                try:
+                    entries = self._db.execute("SELECT COUNT(*) FROM history_search").fetchone()[0]
+                except sqlite3.Error:
+                    pass
+            return {
+                "entries": entries,
+                "pending": self._pending.qsize(),
+                "trigram": self.trigram,
+                "queries": self.queries,
+                "avg_query_ms": round(self.total_query_time / self.queries * 1000, 3) if self.queries else 0.0,
+                "max_query_ms": round(self.max_query_time * 1000, 3),
+            }
+
+    # Index what is still queued, then close the database
+    def close(self):
+        if self._writer is not None:
+            self._pending.put(None)
+            self._writer.join(5.0)
+            self._writer = None
+        with self._lock:
+            if self._db is not None:
+                try:
+                    self._db.close()
+                except sqlite3.Error:
+                    pass
+                self._db = None
+
+history_search = HistorySearchIndex()
+
+# Process-wide translator client. googletrans keeps an httpx client with a
+# keep-alive connection pool, so reusing one Translator avoids a new TLS
+# handshake and DNS lookup on every hotkey press.
+_translator_client = None
+_translator_lock = threading.Lock()
+
+def get_translator():
+    global _translator_client
+    client = _translator_client
+    if client is None:
+        with _translator_lock:
+            if _translator_client is None:
+                Translator = timed_import("googletrans").Translator
+                _translator_client = Translator(timeout=TRANSLATION_TIMEOUT_SECONDS, raise_exception=True)
+            client = _translator_client
+    return client
+
+# Drop a client after a failure so the next request builds a fresh one.
+# Only the client that failed is discarded, in case another thread already rebuilt it.
+def reset_translator(failed_client=None):
+    global _translator_client
+    with _translator_lock:
+        client = _translator_client
+        if client is None or (failed_client is not None and client is not failed_client):
+            return
+        _translator_client = None
+    try:
+        client.client.close()
+    except Exception:
+        pass
+
+# Raised instead of calling a backend that is paused or out of request budget
+class ServiceUnavailable(Exception):
+    pass
+
+class CircuitOpenError(ServiceUnavailable):
+    pass
+
+class RateLimitExceeded(ServiceUnavailable):
+    pass
+
+# Token bucket: `rate` requests per second on average, bursts of up to `capacity`
+class TokenBucket:
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = max(1, capacity)
+        self.allowed = 0
+        self.rejected = 0
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    # Take a token, waiting up to `timeout` seconds for one
+    def acquire(self, timeout=0.0):
+        deadline = time.monotonic() + timeout
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    self.allowed += 1
+                    return True
+                wait = (1 - self._tokens) / self.rate if self.rate > 0 else float("inf")
+                if now + wait > deadline:
+                    self.rejected += 1
+                    return False
+            time.sleep(wait)
+
+    # Tokens available right now, and seconds until `count` tokens will be
+    def tokens(self, count=1):
+        with self._lock:
+            self._refill(time.monotonic())
+            missing = max(0.0, count - self._tokens)
+            return self._tokens, (missing / self.rate if self.rate > 0 else float("inf"))
+
+    def status(self):
+        with self._lock:
+            self._refill(time.monotonic())
+            return {"available": int(self._tokens), "capacity": self.capacity,
+                    "allowed": self.allowed, "rejected": self.rejected}
+
+# Circuit breaker for one backend. Closed: requests flow. Open: requests fail
+# fast until the cooldown passes. Half-open: one probe request decides whether
+# to close again or re-open with a longer cooldown.
+class CircuitBreaker:
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half-open"
+
+    def __init__(self, name, threshold=BREAKER_FAILURE_THRESHOLD, window=BREAKER_WINDOW_SECONDS,
+                 cooldown=BREAKER_COOLDOWN_SECONDS, max_cooldown=BREAKER_MAX_COOLDOWN_SECONDS):
+        self.name = name
+        self.threshold = threshold
+        self.window = window
+        self.base_cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self.state = self.CLOSED
+        self.trips = 0
+        self._cooldown = cooldown
+        self._failures = deque()
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow(self):
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN:
+                if time.monotonic() - self._opened_at < self._cooldown:
+                    return False
+                self.state = self.HALF_OPEN
+                self._probe_in_flight = False
+            if self._probe_in_flight:
+                return False
+            self._probe_in_flight = True
+            return True
+
+    # Give back a probe slot that wasn't used
+    def cancel_probe(self):
+        with self._lock:
+            self._probe_in_flight = False
+
+    def record_success(self):
+        with self._lock:
+            if self.state != self.CLOSED:
+                print(f"{self.name} backend recovered")
+            self.state = self.CLOSED
+            self._cooldown = self.base_cooldown
+            self._failures.clear()
+            self._probe_in_flight = False
+
+    def record_failure(self, rate_limited=False):
+        with self._lock:
+            now = time.monotonic()
+            if self.state == self.HALF_OPEN:
+                # The probe failed: stay away longer this time
+                self._cooldown = min(self._cooldown * 2, self.max_cooldown)
+                self._trip(now)
+                return
+            self._failures.append(now)
+            while self._failures and now - self._failures[0] > self.window:
+                self._failures.popleft()
+            if rate_limited or len(self._failures) >= self.threshold:
+                self._trip(now)
+
+    def _trip(self, now):
+        self.state = self.OPEN
+        self._opened_at = now
+        self._failures.clear()
+        self._probe_in_flight = False
+        self.trips += 1
+        print(f"{self.name} backend paused for {self._cooldown:.0f}s after repeated failures")
+
+    def retry_in(self):
+        with self._lock:
+            if self.state != self.OPEN:
+                return 0.0
+            return max(0.0, self._cooldown - (time.monotonic() - self._opened_at))
+
+    def status(self):
+        return {"state": self.state, "retry_in": round(self.retry_in(), 1), "trips": self.trips}
+
+rate_limiter = TokenBucket(RATE_LIMIT_PER_MINUTE / 60.0, RATE_LIMIT_BURST)
+
+# Base class for translation backends. Capability flags let callers decide how
+# to use a backend: whether several texts can share one call (newline-joined,
+# coming back one line per text), the largest payload it accepts, and which
+# language pairs it can handle (None = any).
+class TranslationBackend:
+    name = "base"
+    supports_batch = False
+    max_payload_chars = None
+    requires_network = True
+
+    def __init__(self):
+        self.failed_until = 0.0
+        self.breaker = CircuitBreaker(self.name) if self.requires_network else None
+
+    def available(self):
+        return True
+
+    def language_pairs(self):
+        return None
+
+    def supports(self, src, dest):
+        pairs = self.language_pairs()
+        if pairs is None:
+            return True
+        return (src, dest) in pairs
+
+    def translate(self, text, dest='ja', src='auto'):
+        raise NotImplementedError
+
+# Google Translate through the shared googletrans client
+class GoogleBackend(TranslationBackend):
+    name = "google"
+    supports_batch = True
+    max_payload_chars = 5000
+
+    def translate(self, text, dest='ja', src='auto'):
+        translator = get_translator()
+        try:
+            return translator.translate(text, dest=dest, src=src).text
+        except Exception:
+            reset_translator(translator)
+            raise
+
+# Offline CPU-only engine using Argos Translate (optional dependency). The
+# installed models are loaded once and kept warm for the life of the process.
+class ArgosBackend(TranslationBackend):
+    name = "local"
+    requires_network = False
+
+    def __init__(self, default_source=LOCAL_SOURCE_LANGUAGE):
+        super().__init__()
+        self.default_source = default_source
+        self._module = None
+        self._load_failed = False
+        self._translations = {}
+        self._pairs = None
+        self._lock = threading.Lock()
+
+    def _load(self):
+        if self._module is None and not self._load_failed:
+            with self._lock:
+                if self._module is None and not self._load_failed:
+                    try:
+                        import argostranslate.translate as argos_translate
+                        pairs = set()
+                        for language in argos_translate.get_installed_languages():
+                            for translation in language.translations_from:
+                                pairs.add((language.code, translation.to_lang.code))
+                        self._pairs = pairs
+                        self._module = argos_translate
+                    except Exception as e:
+                        print(f"Local translation engine not available: {e}")
+                        self._load_failed = True
+        return self._module
+
+    # Cheap check that does not import the engine; models are loaded on first use
+    def available(self):
+        if self._load_failed:
+            return False
+        if self._module is not None:
+            return bool(self._pairs)
+        import importlib.util
+        return importlib.util.find_spec("argostranslate") is not None
+
+    def language_pairs(self):
+        self._load()
+        return self._pairs or set()
+
+    def supports(self, src, dest):
+        if self._module is None:
+            return True  # Not loaded yet; translate() reports missing models
+        return super().supports(self.default_source if src == 'auto' else src, dest)
+
+    def _get_translation(self, src, dest):
+        key = (src, dest)
+        translation = self._translations.get(key)
+        if translation is None:
+            with self._lock:
+                translation = self._translations.get(key)
+                if translation is None:
+                    languages = {language.code: language for language in self._module.get_installed_languages()}
+                    if src not in languages or dest not in languages:
+                        raise ValueError(f"No local model installed for {src} -> {dest}")
+                    translation = languages[src].get_translation(languages[dest])
+                    if translation is None:
+                        raise ValueError(f"No local model installed for {src} -> {dest}")
+                    self._translations[key] = translation
+        return translation
+
+    def translate(self, text, dest='ja', src='auto'):
+        if self._load() is None:
+            raise RuntimeError("Local translation engine is not installed (pip install argostranslate)")
+        src = self.default_source if src == 'auto' else src
+        return self._get_translation(src, dest).translate(text)
+
+translation_backends = {
+    "google": GoogleBackend(),
+    "local": ArgosBackend(),
+}
+
+# Pick the backends to try for a request, in order of preference
+def select_backends(text, dest='ja', src='auto', preferred=None):
+    preferred = (preferred or TRANSLATION_BACKEND).lower()
+    if preferred in translation_backends:
+        return [translation_backends[preferred]]
+    now = time.monotonic()
+    candidates = []
+    for backend in translation_backends.values():
+        if backend.max_payload_chars is not None and len(text) > backend.max_payload_chars:
+            continue
+        if not backend.available() or not backend.supports(src, dest):
+            continue
+        candidates.append(backend)
+    # Backends that failed recently go to the back of the line
+    candidates.sort(key=lambda backend: backend.failed_until > now)
+    return candidates or [translation_backends["google"]]
+
+# Whether the backend a request would go to accepts several newline-joined texts
+# in one call
+def backend_supports_batch(dest='ja', src='auto'):
+    return select_backends("", dest=dest, src=src)[0].supports_batch
+
+# Translate text with the selected backend, falling back to the next one on failure
+# `max_wait` is how long to wait for the request budget before giving up.
+def translate_text(text, dest='ja', src='auto', backend=None, max_wait=RATE_LIMIT_MAX_WAIT_SECONDS):
+    backends = select_backends(text, dest=dest, src=src, preferred=backend)
+    first_error = None
+    for index, candidate in enumerate(backends):
+        breaker = candidate.breaker
+        try:
+            if breaker is not None and not breaker.allow():
+                raise CircuitOpenError(f"{candidate.name} is paused after repeated failures, "
+                                       f"retrying in {breaker.retry_in():.0f}s")
+            if candidate.requires_network and not rate_limiter.acquire(max_wait):
+                if breaker is not None:
+                    breaker.cancel_probe()
+                raise RateLimitExceeded("Too many translation requests, please wait a moment")
+            try:
+                result = candidate.translate(text, dest=dest, src=src)
+            except Exception as e:
+                if breaker is not None:
+                    if is_transient_error(e):
+                        breaker.record_failure(rate_limited=error_status(e) == 429)
+                    else:
+                        breaker.record_success()  # The service answered; the request itself was bad
+                raise
+            if breaker is not None:
+                breaker.record_success()
+            candidate.failed_until = 0.0
+            return result
+        except Exception as e:
+            if not isinstance(e, ServiceUnavailable):
+                candidate.failed_until = time.monotonic() + BACKEND_RETRY_SECONDS
+            if first_error is None:
+                first_error = e
+            if index < len(backends) - 1:
+                print(f"{candidate.name} backend failed ({e}), trying {backends[index + 1].name}")
+    raise first_error
+
+# Split text into pieces no longer than max_chars, preferring paragraph breaks,
+# then sentence ends, then whitespace. Joining the pieces gives back the original text.
+_PARAGRAPH_RE = re.compile(r'.*?(?:\n[ \t]*\n\s*|$)', re.S)
+# A sentence ends at a line break, a CJK terminator, or a Latin terminator followed
+# by whitespace, so decimals (3.14), URLs and domains (www.example.com) and the
+# abbreviations below stay in one piece.
+_ABBREVIATIONS = ("Mr", "Mrs", "Ms", "Dr", "Prof", "St", "vs", "etc", "e.g", "i.e", "a.m", "p.m", "approx", "cf")
+_SENTENCE_RE = re.compile(
+    r'(?:[^.!?。！？\n]+'
+    r'|[.!?]+(?!["\'”」』)]*(?:\s|$))'
+    r'|(?:' + "|".join(r"(?<=\b" + re.escape(word) + ")" for word in _ABBREVIATIONS) + r')\.'
+    r')*(?:[.!?。！？]+["\'”」』)]*|\n|$)\s*')
+
+def _split_units(text, pattern):
+    return [unit for unit in pattern.findall(text) if unit]
+
+def _hard_split(text, max_chars):
+    pieces = []
+    while len(text) > max_chars:
+        cut = max(text.rfind(" ", 0, max_chars), text.rfind("\n", 0, max_chars))
+        cut = cut + 1 if cut > 0 else max_chars
+        pieces.append(text[:cut])
+        text = text[cut:]
+    if text:
+        pieces.append(text)
+    return pieces
+
+def split_into_chunks(text, max_chars=CHUNK_MAX_CHARS):
+    if len(text) <= max_chars:
+        return [text]
+    units = []
+    for paragraph in _split_units(text, _PARAGRAPH_RE):
+        if len(paragraph) <= max_chars:
+            units.append(paragraph)
+            continue
+        for sentence in _split_units(paragraph, _SENTENCE_RE):
+            units.extend(_hard_split(sentence, max_chars))
+
+    # Pack consecutive units into chunks up to the budget
+    chunks = []
+    current = ""
+    for unit in units:
+        if current and len(current) + len(unit) > max_chars:
+            chunks.append(current)
+            current = ""
+        current += unit
+    if current:
+        chunks.append(current)
+    return chunks
+
+# HTTP status carried by an error (from its response or its message), if any
+def error_status(error):
+    status = getattr(getattr(error, "response", None), "status_code", None)
+    if status is None:
+        match = re.search(r"\b(429|5\d\d)\b", str(error))
+        status = int(match.group(1)) if match else None
+    return status
+
+# Errors worth retrying: timeouts, connection problems, rate limiting and server errors
+def is_transient_error(error):
+    if isinstance(error, ServiceUnavailable):
+        return False  # Our own limits; retrying right away won't help
+    if isinstance(error, (asyncio.TimeoutError, TimeoutError, ConnectionError)):
+        return True
+    name = type(error).__name__
+    if any(word in name for word in ("Timeout", "Connect", "Network", "Protocol", "Pool")):
+        return True
+    status = error_status(error)
+    return status == 429 or (status is not None and 500 <= status < 600)
+
+# Rolling latency samples (seconds) grouped by outcome
+class LatencyTracker:
+    def __init__(self, size=1000):
+        self.size = size
+        self._samples = {}
+        self._lock = threading.Lock()
+
+    def record(self, outcome, seconds):
+        with self._lock:
+            samples = self._samples.get(outcome)
+            if samples is None:
+                samples = self._samples[outcome] = deque(maxlen=self.size)
+            samples.append(seconds)
+
+    def report(self):
+        with self._lock:
+            snapshot = {outcome: sorted(samples) for outcome, samples in self._samples.items()}
+        report = {}
+        for outcome, samples in snapshot.items():
+            report[outcome] = {
+                "count": len(samples),
+                "p50": percentile(samples, 50),
+                "p95": percentile(samples, 95),
+                "p99": percentile(samples, 99),
+            }
+        return report
+
+# Nearest-rank percentile of an already sorted list
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    index = max(0, min(len(sorted_values) - 1, int(round(pct / 100.0 * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+# Hands out the engine's concurrent backend calls by priority class. Queued
+# interactive requests always go first and `reserved` slots are kept free for
+# them; background requests also wait while the request budget is low. Runs on
+# the engine's event loop thread.
+class PriorityScheduler:
+    def __init__(self, concurrency, reserved=INTERACTIVE_SLOTS):
+        self.concurrency = concurrency
+        # Background work always keeps at least one slot
+        self.reserved = max(0, min(reserved, concurrency - 1))
+        self.active = dict.fromkeys(PRIORITIES, 0)
+        self.preempted = 0
+        self.waits = LatencyTracker()  # Queue wait per priority class
+        self._queues = {priority: deque() for priority in PRIORITIES}
+        self._refill_handle = None
+
+    def _can_start(self, priority):
+        if sum(self.active.values()) >= self.concurrency:
+            return False
+        if priority == INTERACTIVE:
+            return True
+        if self._queues[INTERACTIVE] or self.active[BACKGROUND] >= self.concurrency - self.reserved:
+            return False
+        if TRANSLATION_BACKEND != "local":
+            needed = min(BACKGROUND_RESERVED_TOKENS, rate_limiter.capacity - 1) + 1
+            tokens, refill_in = rate_limiter.tokens(needed)
+            if tokens < needed:
+                # Look again once the budget has refilled
+                if self._refill_handle is None:
+                    self._refill_handle = asyncio.get_event_loop().call_later(refill_in, self._on_refill)
+                return False
+        return True
+
+    def _on_refill(self):
+        self._refill_handle = None
+        self._wake()
+
+    # Start queued requests while there are free slots, interactive ones first
+    def _wake(self):
+        for priority in PRIORITIES:
+            waiters = self._queues[priority]
+            while waiters and self._can_start(priority):
+                waiter = waiters.popleft()
+                if not waiter.done():
+                    self.active[priority] += 1
+                    waiter.set_result(None)
+
+    # Wait for a slot; record=False leaves the wait out of the stats (e.g. retries)
+    async def acquire(self, priority, record=True):
+        loop = asyncio.get_event_loop()
+        queued_at = loop.time()
+        if not self._queues[priority] and self._can_start(priority):
+            self.active[priority] += 1
+        else:
+            if priority == INTERACTIVE and self._queues[BACKGROUND]:
+                self.preempted += 1
+            waiter = loop.create_future()
+            self._queues[priority].append(waiter)
+            try:
+                await waiter
+            except asyncio.CancelledError:
+                if waiter.done() and not waiter.cancelled():
+                    self.release(priority)
+                else:
+                    try:
+                        self._queues[priority].remove(waiter)
+                    except ValueError:
+                        pass
+                    self._wake()
+                raise
+        if record:
+            self.waits.record(priority, loop.time() - queued_at)
+
+    def release(self, priority):
+        self.active[priority] -= 1
+        self._wake()
+
+    def queued(self, priority):
+        return len(self._queues[priority])
+
+    def stats(self):
+        waits = self.waits.report()
+        report = {"reserved_slots": self.reserved, "preempted": self.preempted}
+        for priority in PRIORITIES:
+            report[priority] = dict(waits.get(priority, {"count": 0, "p50": 0.0, "p95": 0.0, "p99": 0.0}),
+                                    active=self.active[priority], queued=self.queued(priority))
+        return report
+
+# asyncio translation engine running on its own event loop thread. Every request
+# gets a deadline, retries transient errors with jittered exponential backoff and
+# waits for one of the concurrent backend call slots, handed out by priority.
+# submit() can be called from any thread and returns a concurrent.futures.Future.
+class AsyncTranslationEngine:
+    def __init__(self, concurrency=TRANSLATION_CONCURRENCY, deadline=TRANSLATION_DEADLINE_SECONDS,
+                 retries=TRANSLATION_RETRIES, interactive_slots=INTERACTIVE_SLOTS):
+        self.concurrency = max(1, concurrency)
+        self.deadline = deadline
+        self.retries = retries
+        self.interactive_slots = interactive_slots
+        self.latency = LatencyTracker()
+        self.scheduler = None
+        self._loop = None
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def _ensure_started(self):
+        if self._loop is None:
+            with self._lock:
+                if self._loop is None:
+                    loop = asyncio.new_event_loop()
+                    ready = threading.Event()
+
+                    def run():
+                        asyncio.set_event_loop(loop)
+                        self.scheduler = PriorityScheduler(self.concurrency, self.interactive_slots)
+                        ready.set()
+                        loop.run_forever()
+
+                    # Blocking backend calls run here; extra threads absorb calls abandoned after a timeout
+                    self._executor = ThreadPoolExecutor(max_workers=self.concurrency * 2,
+                                                        thread_name_prefix="translation-call")
+                    threading.Thread(target=run, name="translation-engine", daemon=True).start()
+                    ready.wait()
+                    self._loop = loop
+        return self._loop
+
+    def submit(self, text, dest='ja', src='auto', deadline=None, backend=None, priority=INTERACTIVE):
+        loop = self._ensure_started()
+        return asyncio.run_coroutine_threadsafe(
+            self._translate(text, dest, src, deadline or self.deadline, backend, priority), loop)
+
+    # Blocking convenience wrapper around submit()
+    def translate(self, text, dest='ja', src='auto', deadline=None, backend=None, priority=INTERACTIVE):
+        return self.submit(text, dest=dest, src=src, deadline=deadline, backend=backend, priority=priority).result()
+
+    async def _translate(self, text, dest, src, deadline, backend, priority):
+        loop = asyncio.get_event_loop()
+        started = loop.time()
+        expires = started + deadline
+        attempt = 0
+        outcome = "error"
+        try:
+            while True:
+                remaining = expires - loop.time()
+                if remaining <= 0:
+                    outcome = "timeout"
+                    raise asyncio.TimeoutError(f"Translation timed out after {deadline:.0f}s")
+                try:
+                    # Time spent queued for a slot counts against the deadline
+                    await asyncio.wait_for(self.scheduler.acquire(priority, record=attempt == 0), remaining)
+                    try:
+                        # Wait for the request budget as long as the deadline still
+                        # leaves time for the call itself (chunks of a large paste
+                        # queue up for tokens instead of failing)
+                        remaining = expires - loop.time()
+                        max_wait = max(min(RATE_LIMIT_MAX_WAIT_SECONDS, remaining),
+                                       remaining - TRANSLATION_TIMEOUT_SECONDS)
+                        result = await asyncio.wait_for(
+                            loop.run_in_executor(self._executor, translate_text, text, dest, src, backend, max_wait),
+                            max(0.0, remaining))
+                    finally:
+                        self.scheduler.release(priority)
+                    outcome = "ok"
+                    return result
+                except asyncio.CancelledError:
+                    outcome = "cancelled"
+                    raise
+                except Exception as e:
+                    if isinstance(e, asyncio.TimeoutError) and loop.time() >= expires:
+                        outcome = "timeout"
+                        raise asyncio.TimeoutError(f"Translation timed out after {deadline:.0f}s")
+                    if attempt >= self.retries or not is_transient_error(e):
+                        raise
+                    attempt += 1
+                    delay = min(RETRY_BACKOFF_MAX_SECONDS, RETRY_BACKOFF_BASE_SECONDS * (2 ** (attempt - 1)))
+                    delay *= random.uniform(0.5, 1.5)
+                    print(f"Retrying translation ({attempt}/{self.retries}) in {delay:.1f}s: {e}")
+                    await asyncio.sleep(min(delay, max(0.0, expires - loop.time())))
+        finally:
+            self.latency.record(outcome, loop.time() - started)
+
+    def latency_report(self):
+        return self.latency.report()
+
+    def scheduler_report(self):
+        return self.scheduler.stats() if self.scheduler is not None else {}
+
+translation_engine = AsyncTranslationEngine()
+
+# Packs short texts submitted within a few milliseconds of each other into one
+# engine request per (dest, src) and hands each caller its own line of the result.
+# Only background work is batched: an interactive text would just sit out the
+# window, so it goes straight to the engine. If the backend doesn't return one
+# line per text, the batch is translated one text at a time instead.
+class TranslationBatcher:
+    def __init__(self, window=BATCH_WINDOW_SECONDS, max_chars=BATCH_MAX_CHARS, max_items=BATCH_MAX_ITEMS):
+        self.window = window
+        self.max_chars = max_chars
+        self.max_items = max_items
+        self.items = 0
+        self.requests = 0
+        self.fallbacks = 0
+        self._open = {}  # (dest, src) -> batch still accepting texts
+        self._ready = deque()
+        self._condition = threading.Condition()
+        self._thread = None
+
+    def accepts(self, text, priority=BACKGROUND, dest='ja', src='auto'):
+        return (self.window > 0 and priority != INTERACTIVE and len(text) < self.max_chars
+                and "\n" not in text and "\r" not in text and backend_supports_batch(dest, src))
+
+    # Returns a Future for the translation of `text`
+    def submit(self, text, dest='ja', src='auto', priority=BACKGROUND):
+        future = Future()
+        with self._condition:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="translation-batcher", daemon=True)
+                self._thread.start()
+            key = (dest, src)
+            batch = self._open.get(key)
+            if batch is not None and (batch["chars"] + len(text) + 1 > self.max_chars
+                                      or len(batch["items"]) >= self.max_items):
+                self._ready.append(self._open.pop(key))
+                batch = None
+            if batch is None:
+                batch = self._open[key] = {"dest": dest, "src": src, "items": [], "chars": 0,
+                                           "flush_at": time.monotonic() + self.window, "priority": priority}
+            batch["items"].append((text, future))
+            batch["chars"] += len(text) + 1
+            self.items += 1
+            self._condition.notify()
+        return future
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while True:
+                    now = time.monotonic()
+                    for key, batch in list(self._open.items()):
+                        if batch["flush_at"] <= now:
+                            self._ready.append(self._open.pop(key))
+                    if self._ready:
+                        break
+                    timeout = min(batch["flush_at"] for batch in self._open.values()) - now if self._open else None
+                    self._condition.wait(timeout)
+                ready = list(self._ready)
+                self._ready.clear()
+            for batch in ready:
+                self._send(batch)
+
+    def _send(self, batch):
+        # Drop texts whose caller has given up on them
+        items = [(text, future) for text, future in batch["items"] if future.set_running_or_notify_cancel()]
+        if not items:
+            return
+        with self._condition:
+            self.requests += 1
+        texts = [text for text, future in items]
+        request = translation_engine.submit("\n".join(texts), dest=batch["dest"], src=batch["src"],
+                                            priority=batch["priority"])
+        request.add_done_callback(lambda done: self._deliver(done, items, batch))
+
+    # Runs on the engine's loop thread: must not block
+    def _deliver(self, request, items, batch):
+        error = request.exception()
+        if error is not None:
+            for text, future in items:
+                future.set_exception(error)
+            return
+        lines = request.result().split("\n")
+        if len(lines) == len(items):
+            for (text, future), line in zip(items, lines):
+                future.set_result(line.strip() if len(items) > 1 else line)
+            return
+        with self._condition:
+            self.fallbacks += 1
+            self.requests += len(items)
+        for text, future in items:
+            single = translation_engine.submit(text, dest=batch["dest"], src=batch["src"], priority=batch["priority"])
+            single.add_done_callback(lambda done, future=future: self._copy_result(done, future))
+
+    @staticmethod
+    def _copy_result(done, future):
+        error = done.exception()
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(done.result())
+
+    def stats(self):
+        with self._condition:
+            return {"items": self.items, "requests": self.requests, "fallbacks": self.fallbacks}
+
+translation_batcher = TranslationBatcher()
+
+# Split a chunk into (leading whitespace, body, trailing whitespace)
+def _strip_chunk(chunk):
+    body = chunk.strip()
+    if not body:
+        return chunk, "", ""
+    leading = chunk[:len(chunk) - len(chunk.lstrip())]
+    trailing = chunk[len(chunk.rstrip()):]
+    return leading, body, trailing
+
+# Raised when a translation is abandoned because the user cancelled it
+class TranslationCancelled(Exception):
+    pass
+
+# Wait for a future's result, giving up with TranslationCancelled as soon as
+# cancelled() reports the request is no longer wanted. The future is cancelled
+# as well (unless it is shared with other requests), so work that hasn't reached
+# the backend yet is never sent.
+def wait_for_result(future, cancelled=None, cancel_future=True):
+    if cancelled is None:
+        return future.result()
+    while True:
+        if cancelled():
+            if cancel_future:
+                future.cancel()
+            raise TranslationCancelled()
+        try:
+            return future.result(timeout=CANCEL_POLL_SECONDS)
+        except FutureTimeoutError:
+            if future.done():
+                raise  # The translation itself timed out
+
+# Translate text of any size: short text is sent as-is, long text is split into
+# chunks that are translated concurrently and reassembled in document order.
+# on_segment(index, total, translated_segment) is called in document order as
+# soon as each segment and all segments before it are done.
+def translate_long_text(text, dest='ja', src='auto', max_chars=CHUNK_MAX_CHARS,
+                        on_segment=None, cancelled=None, priority=INTERACTIVE):
+    chunks = split_into_chunks(text, max_chars)
+    if len(chunks) == 1:
+        if translation_batcher.accepts(text, priority, dest, src):
+            future = translation_batcher.submit(text, dest=dest, src=src, priority=priority)
+        else:
+            future = translation_engine.submit(text, dest=dest, src=src, priority=priority)
+        translated = wait_for_result(future, cancelled)
+        if on_segment is not None:
+            on_segment(0, 1, translated)
+        return translated
+    parts = [_strip_chunk(chunk) for chunk in chunks]
+    # Only as many chunks as the engine runs at once (and the request budget holds)
+    # are submitted ahead: a chunk's deadline starts when it is submitted, so
+    # chunks queued behind the budget must not use it up while they wait their turn
+    window = max(1, min(translation_engine.concurrency, rate_limiter.capacity))
+    futures = [None] * len(parts)
+    results = []
+    try:
+        for index, (leading, body, trailing) in enumerate(parts):
+            for ahead in range(index, min(index + window, len(parts))):
+                if futures[ahead] is None and parts[ahead][1]:
+                    futures[ahead] = translation_engine.submit(parts[ahead][1], dest=dest, src=src, priority=priority)
+            future = futures[index]
+            results.append(leading + wait_for_result(future, cancelled) + trailing if future is not None else leading)
+            if on_segment is not None:
+                on_segment(index, len(parts), results[-1])
+    except BaseException:
+        for future in futures:
+            if future is not None:
+                future.cancel()
+        raise
+    return "".join(results)
+
+# Segment translation memory counters
+segment_memory_stats = {"texts": 0, "segments": 0, "hits": 0, "misses": 0, "requests": 0}
+_segment_stats_lock = threading.Lock()
+
+def _count_segments(**counts):
+    with _segment_stats_lock:
+        for name, value in counts.items():
+            segment_memory_stats[name] += value
+
+# Whether `text` is translated sentence by sentence through the segment memory
+def uses_segment_memory(text):
+    return SEGMENT_MEMORY and len(text) >= SEGMENT_MEMORY_MIN_CHARS
+
+# Split text into sentence/line segments as (leading whitespace, body, trailing whitespace)
+def split_segments(text):
+    return [_strip_chunk(unit) for unit in _split_units(text, _SENTENCE_RE)]
+
+# Translate a list of single-line segments. They are sent newline-joined in groups
+# under the chunk budget; if the backend can't take batches or doesn't return one
+# line per segment, the group's segments are translated one by one instead.
+def _translate_segment_group(group, dest, src, priority=INTERACTIVE, cancelled=None):
+    if len(group) == 1 or backend_supports_batch(dest, src):
+        translated = wait_for_result(
+            translation_engine.submit("\n".join(group), dest=dest, src=src, priority=priority), cancelled)
+        lines = translated.split("\n")
+        if len(lines) == len(group):
+            return [line.strip() for line in lines]
+    futures = [translation_engine.submit(body, dest=dest, src=src, priority=priority) for body in group]
+    try:
+        return [wait_for_result(future, cancelled) for future in futures]
+    except BaseException:
+        for future in futures:
+            future.cancel()
+        raise
+
+# Translate text segment by segment through the translation memory (the cache).
+# Segments seen before are reused; only unseen ones go to the backend. on_segment
+# is called in document order as translated groups complete.
+def translate_with_segment_memory(text, dest='ja', src='auto', on_segment=None, cancelled=None, parts=None,
+                                  priority=INTERACTIVE):
+    if parts is None:
+        parts = split_segments(text)
+    translations = {}
+    misses = []
+    for leading, body, trailing in parts:
+        if body and body not in translations:
+            cached = translation_cache.get(body, src=src, dest=dest)
+            translations[body] = cached
+            if cached is None:
+                misses.append(body)
+    _count_segments(texts=1, segments=len(translations), hits=len(translations) - len(misses), misses=len(misses))
+
+    # Over-long segments go through the chunked path on their own
+    long_bodies = [body for body in misses if len(body) > CHUNK_MAX_CHARS]
+    groups = []
+    current = []
+    size = 0
+    for body in misses:
+        if len(body) > CHUNK_MAX_CHARS:
+            continue
+        if current and size + len(body) + 1 > CHUNK_MAX_CHARS:
+            groups.append(current)
+            current = []
+            size = 0
+        current.append(body)
+        size += len(body) + 1
+    if current:
+        groups.append(current)
+    _count_segments(requests=len(groups) + len(long_bodies))
+
+    for body in long_bodies:
+        translations[body] = translate_long_text(body, dest=dest, src=src, cancelled=cancelled, priority=priority)
+        translation_cache.put(body, translations[body], src=src, dest=dest)
+
+    executor = get_segment_executor(priority)
+    futures = [executor.submit(_translate_segment_group, group, dest, src, priority, cancelled) for group in groups]
+    emitted = 0
+    total = max(1, len(futures))
+
+    # Hand out the longest prefix of the document whose segments are all translated
+    def emit_ready(index):
+        nonlocal emitted
+        start = emitted
+        while emitted < len(parts) and (not parts[emitted][1] or translations.get(parts[emitted][1]) is not None):
+            emitted += 1
+        if on_segment is not None and (emitted > start or index == total - 1):
+            on_segment(index, total, _stitch_segments(parts[start:emitted], translations))
+
+    try:
+        if not futures:
+            emit_ready(0)
+        for index, (group, future) in enumerate(zip(groups, futures)):
+            for body, translated in zip(group, wait_for_result(future, cancelled)):
+                translations[body] = translated
+                translation_cache.put(body, translated, src=src, dest=dest)
+            emit_ready(index)
+    except BaseException:
+        for future in futures:
+            future.cancel()
+        raise
+    return _stitch_segments(parts, translations)
+
+def _stitch_segments(parts, translations):
+    return "".join(leading + (translations[body] if body else "") + trailing
+                   for leading, body, trailing in parts)
+
+_segment_executors = {}
+_segment_executor_lock = threading.Lock()
+
+# Threads waiting on segment groups, one pool per priority class so interactive
+# groups never queue behind background ones; the engine bounds the actual backend calls
+def get_segment_executor(priority=INTERACTIVE):
+    with _segment_executor_lock:
+        executor = _segment_executors.get(priority)
+        if executor is None:
+            executor = _segment_executors[priority] = ThreadPoolExecutor(
+                max_workers=max(1, TRANSLATION_CONCURRENCY), thread_name_prefix=f"segment-translator-{priority}")
+        return executor
+
+# Local source language detection, run before any network call so text that is
+# already in the target language (or has nothing to translate) is not sent.
+# Scripts are told apart by Unicode ranges; Latin-script languages by a small
+# profile of their most common words.
+_URL_RE = re.compile(r"(?:https?://|www\.)\S+|[\w.+-]+@[\w-]+(?:\.[\w-]+)+")
+_LETTER_RE = re.compile(r"[^\W\d_]")
+_WORD_RE = re.compile(r"[^\W\d_]+")
+_SCRIPT_RES = {
+    "kana": re.compile(r"[\u3040-\u30ff\u31f0-\u31ff\uff66-\uff9f]"),
+    "han": re.compile(r"[\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff]"),
+    "hangul": re.compile(r"[\u1100-\u11ff\u3130-\u318f\uac00-\ud7af]"),
+    "latin": re.compile(r"[A-Za-z\u00c0-\u024f]"),
+    "thai": re.compile(r"[\u0e00-\u0e7f]"),
+    "greek": re.compile(r"[\u0370-\u03ff]"),
+    "hebrew": re.compile(r"[\u0590-\u05ff]"),
+}
+# Scripts used by a single language we translate into
+_SCRIPT_LANGUAGES = {"hangul": "ko", "thai": "th", "greek": "el", "hebrew": "iw"}
+_COMMON_WORDS = {
+    "en": {"the", "and", "is", "are", "of", "to", "in", "that", "it", "you", "for", "with", "this", "was", "have", "not"},
+    "fr": {"le", "la", "les", "des", "est", "et", "une", "un", "du", "que", "pas", "pour", "dans", "je", "vous", "avec"},
+    "de": {"der", "die", "das", "und", "ist", "nicht", "ein", "eine", "ich", "zu", "mit", "den", "von", "sie", "auf", "es"},
+    "es": {"el", "la", "los", "las", "y", "es", "de", "que", "en", "un", "una", "por", "con", "para", "no", "se"},
+    "it": {"il", "lo", "la", "gli", "e", "di", "che", "è", "un", "una", "per", "non", "con", "sono", "del", "della"},
+    "pt": {"o", "a", "os", "as", "e", "de", "que", "é", "um", "uma", "para", "com", "não", "do", "da", "em"},
+}
+# Lines that only make sense as source code
+_CODE_LINE_RE = re.compile(
+    r"[;{}\[(]$|^[})\]]|^#include\b|^@\w+|^(?:async\s+)?def\s+\w+\s*\(.*:$|^class\s+\w+.*[:{]$"
+    r"|^import\s+[\w.]+(?:\s+as\s+\w+)?$|^from\s+[\w.]+\s+import\s|^(?:const|let|var|function|public|private|static)\b.*[;{)]$"
+    r"|^(?:if|elif|else|for|while|try|except|finally|with)\b.*:$|^return\b|^[\w.]+\(.*\)$"
+    r"|^\w[\w.\[\]'\"]*\s*(?:[-+*/]?=|:=)\s*\S")
+_CODE_COMMENT_RE = re.compile(r"^(?://|/\*|\*|#(?!include))")
+# Each of these lines also shows up in prose ("for example:", "Total = 5"), so
+# text only counts as code with several such lines and structure prose lacks
+CODE_MIN_LINES = 3
+_CODE_OPERATOR_RE = re.compile(r"==|!=|<=|>=|=>|->|&&|\|\||::|\+=|-=|\+\+|;\s*$")
+_CODE_CALL_RE = re.compile(r"\w\(")
+_CODE_KEYWORD_RE = re.compile(
+    r"^\s*(?:(?:async\s+)?def\s+\w+\s*\(|class\s+\w+|#include\b|import\s+[\w.]+|from\s+[\w.]+\s+import\s"
+    r"|function\s+\w+\s*\(|(?:const|let|var)\s+\w+\s*=)", re.M)
+DETECTION_SAMPLE_CHARS = 4000
+# detect_language() results meaning there is nothing to translate
+UNTRANSLATABLE = ("none", "code")
+
+detection_stats = {"checked": 0, "skipped_same_language": 0, "skipped_untranslatable": 0}
+detected_languages = Counter()
+_detection_lock = threading.Lock()
+
+def _looks_like_code(text):
+    code_lines = prose_lines = 0
+    indented_blocks = 0  # Indented lines right after a line opening a block
+    open_brackets = 0
+    spanning_brackets = False  # A bracket opened on one line and closed on another
+    previous = ""
+    for raw_line in text.splitlines():
+        line = raw_line.strip()
+        if not line or _CODE_COMMENT_RE.match(line):
+            continue
+        if _CODE_LINE_RE.search(line):
+            code_lines += 1
+        else:
+            prose_lines += 1
+        if raw_line[:1] in (" ", "\t") and previous.endswith((":", "{", "(", "[")):
+            indented_blocks += 1
+        open_brackets += sum(line.count(c) for c in "([{") - sum(line.count(c) for c in ")]}")
+        if open_brackets > 0:
+            spanning_brackets = True
+        previous = line
+    if code_lines < CODE_MIN_LINES or code_lines < 4 * prose_lines:
+        return False
+    signals = [
+        indented_blocks > 0,
+        spanning_brackets and open_brackets == 0,
+        len(_CODE_OPERATOR_RE.findall(text)) >= 2,
+        len(_CODE_CALL_RE.findall(text)) >= 2,
+        _CODE_KEYWORD_RE.search(text) is not None,
+    ]
+    return sum(signals) >= 2
+
+# Best guess at the language of `text`: a language code, "none" for text without
+# words (numbers, URLs, e-mail addresses), "code" for source code, or None if unsure.
+# Only a sample from the start of long texts is looked at.
+def detect_language(text):
+    sample = _URL_RE.sub(" ", text[:DETECTION_SAMPLE_CHARS])
+    letters = len(_LETTER_RE.findall(sample))
+    if letters == 0:
+        # Anything past the sample could still hold words
+        if len(text) <= DETECTION_SAMPLE_CHARS or not _LETTER_RE.search(_URL_RE.sub(" ", text)):
+            return "none"
+        return None
+    if len(text) <= DETECTION_SAMPLE_CHARS and _looks_like_code(sample):
+        return "code"
+    counts = {script: len(pattern.findall(sample)) for script, pattern in _SCRIPT_RES.items()}
+    if counts["kana"] and counts["kana"] + counts["han"] >= letters * 0.5:
+        return "ja"
+    if counts["han"] >= letters * 0.5:
+        return "zh"
+    for script, language in _SCRIPT_LANGUAGES.items():
+        if counts[script] >= letters * 0.5:
+            return language
+    if counts["latin"] >= letters * 0.8:
+        words = Counter(word.lower() for word in _WORD_RE.findall(sample))
+        scores = sorted(((sum(words[word] for word in common), language)
+                         for language, common in _COMMON_WORDS.items()), reverse=True)
+        (best, language), (runner_up, _) = scores[0], scores[1]
+        if best >= 3 and best >= runner_up * 1.5:
+            return language
+    return None
+
+# Whether text detected as `detected` still has to be sent to translate into `dest`.
+# Han-only text is reported as "zh" and never matches zh-cn/zh-tw, since converting
+# between simplified and traditional characters is a real translation.
+def needs_translation(detected, dest):
+    if detected in UNTRANSLATABLE:
+        return False
+    return detected is None or detected != dest.lower()
+
+# Detect the language of `text` once and return the targets that need no
+# translation. The outcome is counted in detection_stats and, when given, stored
+# in `info` (a request's StageTimer.info).
+def skipped_targets(text, dests, info=None):
+    if not LOCAL_DETECTION:
+        return []
+    detected = detect_language(text)
+    skipped = [dest for dest in dests if not needs_translation(detected, dest)]
+    with _detection_lock:
+        detection_stats["checked"] += 1
+        detected_languages[detected or "unknown"] += 1
+        reason = "skipped_untranslatable" if detected in UNTRANSLATABLE else "skipped_same_language"
+        detection_stats[reason] += len(skipped)
+    if info is not None:
+        info["detected"] = detected or "unknown"
+        if skipped:
+            info["skipped"] = skipped
+    return skipped
+
+def detection_report():
+    with _detection_lock:
+        return dict(detection_stats, languages=dict(detected_languages))
+
+# Translations currently being fetched, so concurrent requests for the same text
+# (e.g. a watch-mode prefetch and a hotkey press) share one backend call.
+# Maps the cache key to (future, priority).
+_inflight_translations = {}
+_inflight_lock = threading.Lock()
+
+# Translate text through the cache. Returns (translated_text, from_cache).
+def translate_with_cache(text, dest='ja', src='auto', on_segment=None, cancelled=None, priority=INTERACTIVE):
+    if skipped_targets(text, [dest]):
+        return text, False
+    translated = translation_cache.get(text, src=src, dest=dest)
+    if translated is not None:
+        return translated, True
+    return _translate_uncached(text, dest, src, on_segment, cancelled, priority=priority), False
+
+# Translate text that missed the cache and store the result. `parts` is the
+# text's split_segments() result, when the caller already has it.
+def _translate_uncached(text, dest, src, on_segment=None, cancelled=None, parts=None, priority=INTERACTIVE):
+    key = TranslationCache.make_key(text, src, dest)
+    with _inflight_lock:
+        leader, leader_priority = _inflight_translations.get(key, (None, None))
+        # Don't wait on a background request that is itself stuck behind other background work
+        if (leader is not None and priority == INTERACTIVE and leader_priority == BACKGROUND
+                and translation_engine.scheduler is not None and translation_engine.scheduler.queued(BACKGROUND)):
+            leader = None
+            future = None
+        elif leader is None:
+            future = Future()
+            _inflight_translations[key] = (future, priority)
+    if leader is not None and on_segment is None:
+        try:
+            # Stop waiting if this request is cancelled, but leave the other one running
+            return wait_for_result(leader, cancelled, cancel_future=False)
+        except TranslationCancelled:
+            if cancelled is not None and cancelled():
+                raise
+        # The other request was abandoned; translate it ourselves
+        return translate_with_cache(text, dest=dest, src=src, cancelled=cancelled, priority=priority)[0]
+    if leader is not None:
+        # Streaming callers need their own segments
+        future = None
+
+    try:
+        if uses_segment_memory(text) and parts is None:
+            parts = split_segments(text)
+        if uses_segment_memory(text) and len(parts) > 1:
+            translated = translate_with_segment_memory(text, dest=dest, src=src, on_segment=on_segment,
+                                                       cancelled=cancelled, parts=parts, priority=priority)
+        else:
+            translated = translate_long_text(text, dest=dest, src=src, on_segment=on_segment, cancelled=cancelled,
+                                             priority=priority)
+        translation_cache.put(text, translated, src=src, dest=dest)
+    except BaseException as e:
+        if future is not None:
+            with _inflight_lock:
+                _inflight_translations.pop(key, None)
+            future.set_exception(e)
+        raise
+    if future is not None:
+        with _inflight_lock:
+            _inflight_translations.pop(key, None)
+        future.set_result(translated)
+    return translated
+
+def language_name(code):
+    return LANGUAGE_NAMES.get(code, code)
+
+# Target languages for labels, e.g. "Japanese / Korean"
+def target_languages_display(dests=None):
+    return " / ".join(language_name(dest) for dest in (dests or TARGET_LANGUAGES))
+
+_fanout_executors = {}
+_fanout_executor_lock = threading.Lock()
+
+# Threads translating the additional targets of multi-target requests, one pool per priority class
+def get_fanout_executor(priority=INTERACTIVE):
+    with _fanout_executor_lock:
+        executor = _fanout_executors.get(priority)
+        if executor is None:
+            executor = _fanout_executors[priority] = ThreadPoolExecutor(
+                max_workers=max(1, TRANSLATION_CONCURRENCY), thread_name_prefix=f"target-translator-{priority}")
+        return executor
+
+# Translate one text into several languages at once, so the total latency is that
+# of the slowest target. Source-side work (segmentation, cache lookups) is done
+# once up front; targets that missed the cache are translated concurrently, the
+# first one on the calling thread so on_segment can stream it.
+# Returns (results, errors): results maps each translated target to
+# (translated_text, from_cache) in `dests` order, errors maps the other targets
+# to their exception. A failure of the first target is raised instead. Targets
+# that need no translation (see skipped_targets) get the text back unchanged.
+def translate_to_targets(text, dests, src='auto', on_segment=None, cancelled=None, info=None, priority=INTERACTIVE):
+    primary = dests[0]
+    results = {}
+    misses = []
+    skipped = skipped_targets(text, dests, info)
+    for dest in dests:
+        if dest in skipped:
+            results[dest] = (text, False)
+            continue
+        cached = translation_cache.get(text, src=src, dest=dest)
+        if cached is not None:
+            results[dest] = (cached, True)
+        else:
+            misses.append(dest)
+    parts = split_segments(text) if uses_segment_memory(text) and misses else None
+
+    executor = get_fanout_executor(priority)
+    futures = OrderedDict(
+        (dest, executor.submit(_translate_uncached, text, dest, src, None, cancelled, parts, priority))
+        for dest in misses if dest != primary)
+    try:
+        if primary in misses:
+            results[primary] = (_translate_uncached(text, primary, src, on_segment, cancelled, parts, priority), False)
+    except BaseException:
+        for future in futures.values():
+            future.cancel()
+        raise
+    errors = OrderedDict()
+    for dest, future in futures.items():
+        try:
+            results[dest] = (wait_for_result(future, cancelled), False)
+        except TranslationCancelled:
+            for pending in futures.values():
+                pending.cancel()
+            raise
+        except Exception as e:
+            errors[dest] = e
+    return OrderedDict((dest, results[dest]) for dest in dests if dest in results), errors
+
+# Wall-clock time spent in each stage of one translate_clipboard() request
+class StageTimer:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.stages = OrderedDict()
+        self.info = {}
+        self.outcome = "ok"
+        # The request's cancelled() check, if it can be cancelled or superseded
+        self.cancelled = None
+        # Parts still running: the request thread, plus a UI update once one is posted
+        self._pending = 1
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - start)
+
+    def add(self, name, seconds):
+        self.stages[name] = self.stages.get(name, 0.0) + seconds
+
+    def total(self):
+        return time.perf_counter() - self.started
+
+    def expect_part(self):
+        with self._lock:
+            self._pending += 1
+
+    # The request is recorded when its last part finishes
+    def part_done(self):
+        with self._lock:
+            self._pending -= 1
+            finished = self._pending == 0
+        if finished:
+            metrics.record(self, self.outcome)
+
+# Collects stage timings of finished requests: rolling percentiles for the
+# stats panel, cumulative histograms for Prometheus and a JSON log line each
+class MetricsRecorder:
+    def __init__(self, window=METRICS_WINDOW, log_path=METRICS_LOG_PATH, prometheus_file=PROMETHEUS_FILE):
+        self.window = LatencyTracker(size=window)
+        self.log_path = log_path
+        self.prometheus_file = prometheus_file
+        self.outcomes = Counter()
+        self._histograms = {}  # stage -> [bucket counts..., +Inf count, sum]
+        self._lock = threading.Lock()
+        self._last_prometheus_write = 0.0
+
+    def record(self, timer, outcome):
+        stages = dict(timer.stages)
+        stages["total"] = timer.total()
+        with self._lock:
+            self.outcomes[outcome] += 1
+            for name, seconds in stages.items():
+                histogram = self._histograms.get(name)
+                if histogram is None:
+                    histogram = self._histograms[name] = [0] * (len(METRICS_BUCKETS) + 2)
+                for index, bound in enumerate(METRICS_BUCKETS):
+                    if seconds <= bound:
+                        histogram[index] += 1
+                histogram[-2] += 1
+                histogram[-1] += seconds
+        for name, seconds in stages.items():
+            self.window.record(name, seconds)
+        self._write_log(dict(timer.info, ts=round(time.time(), 3), outcome=outcome,
+                             stages_ms={name: round(seconds * 1000, 3) for name, seconds in stages.items()}))
+        self._write_prometheus()
+
+    def _write_log(self, entry):
+        if not self.log_path:
+            return
+        try:
+            line = json.dumps(entry, ensure_ascii=False) + "\n"
+            os.makedirs(os.path.dirname(self.log_path) or ".", exist_ok=True)
+            with self._lock:
+                if os.path.exists(self.log_path) and os.path.getsize(self.log_path) > METRICS_LOG_MAX_BYTES:
+                    os.replace(self.log_path, self.log_path + ".1")
+                with open(self.log_path, "a", encoding="utf-8") as log_file:
+                    log_file.write(line)
+        except OSError as e:
+            print(f"Could not write metrics log: {e}")
+            self.log_path = ""
+
+    # Rewrite the Prometheus file at most once a second
+    def _write_prometheus(self):
+        if not self.prometheus_file or time.monotonic() - self._last_prometheus_write < 1.0:
+            return
+        self._last_prometheus_write = time.monotonic()
+        try:
+            temp_path = self.prometheus_file + ".tmp"
+            with open(temp_path, "w", encoding="utf-8") as prometheus_file:
+                prometheus_file.write(self.render_prometheus())
+            os.replace(temp_path, self.prometheus_file)
+        except OSError as e:
+            print(f"Could not write Prometheus metrics: {e}")
+
+    def render_prometheus(self):
+        lines = ["# HELP cjt_stage_seconds Time spent in each stage of a clipboard translation.",
+                 "# TYPE cjt_stage_seconds histogram"]
+        with self._lock:
+            for name, histogram in sorted(self._histograms.items()):
+                for bound, count in zip(METRICS_BUCKETS, histogram):
+                    lines.append(f'cjt_stage_seconds_bucket{{stage="{name}",le="{bound}"}} {count}')
+                lines.append(f'cjt_stage_seconds_bucket{{stage="{name}",le="+Inf"}} {histogram[-2]}')
+                lines.append(f'cjt_stage_seconds_sum{{stage="{name}"}} {histogram[-1]:.6f}')
+                lines.append(f'cjt_stage_seconds_count{{stage="{name}"}} {histogram[-2]}')
+            lines.append("# HELP cjt_requests_total Clipboard translation requests by outcome.")
+            lines.append("# TYPE cjt_requests_total counter")
+            for outcome, count in sorted(self.outcomes.items()):
+                lines.append(f'cjt_requests_total{{outcome="{outcome}"}} {count}')
+        detection = detection_report()
+        lines.append("# HELP cjt_detected_language_total Source languages detected locally.")
+        lines.append("# TYPE cjt_detected_language_total counter")
+        for language, count in sorted(detection["languages"].items()):
+            lines.append(f'cjt_detected_language_total{{language="{language}"}} {count}')
+        lines.append("# HELP cjt_translations_skipped_total Translations skipped after local detection.")
+        lines.append("# TYPE cjt_translations_skipped_total counter")
+        lines.append(f'cjt_translations_skipped_total{{reason="same_language"}} {detection["skipped_same_language"]}')
+        lines.append(f'cjt_translations_skipped_total{{reason="untranslatable"}} {detection["skipped_untranslatable"]}')
+        cache = translation_cache.stats()
+        lines.append("# TYPE cjt_cache_hits_total counter")
+        lines.append(f"cjt_cache_hits_total {cache['hits']}")
+        lines.append("# TYPE cjt_cache_misses_total counter")
+        lines.append(f"cjt_cache_misses_total {cache['misses']}")
+        return "\n".join(lines) + "\n"
+
+    def report(self):
+        return self.window.report()
+
+metrics = MetricsRecorder()
+
+# Apply a request's final UI update on the Tk thread and time it as the "ui" stage.
+# Updates of requests cancelled or superseded in the meantime are dropped.
+def _apply_ui_update(timer, posted_at, callback, *args):
+    try:
+        if timer.cancelled is None or not timer.cancelled():
+            callback(*args)
+    finally:
+        timer.add("ui", time.perf_counter() - posted_at)
+        timer.part_done()
+
+# Post the final UI update for a request and set its outcome
+def finish_request(timer, outcome, callback, *args):
+    timer.outcome = outcome
+    if ui_running:
+        timer.expect_part()
+        post_to_ui(_apply_ui_update, timer, time.perf_counter(), callback, *args)
+
+# Held while a request checks that it is still current and writes the clipboard
+clipboard_write_lock = threading.Lock()
+
+# Core translation function. Each stage is timed and the request is reported to
+# the metrics once it has finished, including its UI update.
+def translate_clipboard(show_notification_flag=True, clipboard_text=None, cancelled=None, timer=None):
+    if timer is None:
+        timer = StageTimer()
+    timer.cancelled = cancelled
+    try:
+        return _translate_clipboard(timer, show_notification_flag, clipboard_text, cancelled)
+    finally:
+        timer.part_done()
+
+def _translate_clipboard(timer, show_notification_flag, clipboard_text, cancelled):
+    # Get text from clipboard (unless the caller already read it)
+    if clipboard_text is None:
+        with timer.stage("paste"):
+            clipboard_text = pyperclip.paste()
+    timer.info["chars"] = len(clipboard_text or "")
     
     # Check if clipboard has text
     if not clipboard_text:
+        finish_request(timer, "empty", set_result_message, "Clipboard is empty")
         if show_notification_flag:
-            show_notification("Clipboard Japanese Translator", "Clipboard is empty")
-        if 'root' in globals() and root.winfo_exists() and root.winfo_viewable():
-            result_label.config(text="Clipboard is empty")
+            with timer.stage("notify"):
+                show_notification("Clipboard Japanese Translator", "Clipboard is empty")
         return
     
-    # Translate text to Japanese
-    translator = Translator()
+    # Translate text into every target language; the first one goes to the clipboard
+    dests = TARGET_LANGUAGES
+    primary = dests[0]
+    timer.info["targets"] = dests
     try:
-        translation = translator.translate(clipboard_text, dest='ja')
-        translated_text = translation.text
+        on_segment = None
+        streamed = STREAM_RESULTS and len(clipboard_text) > CHUNK_MAX_CHARS
+        if streamed:
+            partial = []
+            
+            # Render each segment as it arrives instead of waiting for the whole text
+            def on_segment(index, total, segment):
+                if cancelled is not None and cancelled():
+                    return
+                if not partial:
+                    timer.info["first_segment_ms"] = round((time.perf_counter() - timer.started) * 1000, 3)
+                    post_to_ui(begin_streamed_result, clipboard_text)
+                post_to_ui(append_streamed_segment, segment, index + 1, total)
+                partial.append(segment)
+                if STREAM_TO_CLIPBOARD and index + 1 < total:
+                    with clipboard_write_lock:
+                        if cancelled is None or not cancelled():
+                            pyperclip.copy("".join(partial))
         
-        # Copy translated text back to clipboard
-        pyperclip.copy(translated_text)
+        with timer.stage("translate"):
+            results, errors = translate_to_targets(clipboard_text, dests, on_segment=on_segment,
+                                                   cancelled=cancelled, info=timer.info)
+        translated_text, from_cache = results[primary]
+        timer.info["from_cache"] = from_cache
+        skipped = timer.info.get("skipped", [])
+        primary_skipped = primary in skipped
+        translations = OrderedDict((dest, text) for dest, (text, cached) in results.items())
+        for dest, error in errors.items():
+            translations[dest] = f"Error: {error}"
+            print(f"Translation to {dest} failed: {error}")
+        streamed = streamed and not from_cache and not primary_skipped
         
-        # Update UI if window exists and is visible
-        if 'root' in globals() and root.winfo_exists() and root.winfo_viewable():
-            original_text.delete(1.0, tk.END)
-            original_text.insert(tk.END, clipboard_text)
+        # Drop the result if the request was cancelled or superseded while in flight.
+        # Checking and copying under one lock means a stale request can never
+        # overwrite the clipboard after a newer one has written it.
+        with clipboard_write_lock:
+            if cancelled is not None and cancelled():
+                timer.outcome = "cancelled"
+                return None
             
-            translated_display.delete(1.0, tk.END)
-            translated_display.insert(tk.END, translated_text)
-            
-            result_label.config(text="Translated and copied to clipboard!")
+            # Copy translated text back to clipboard (unless it already holds the right text)
+            if not primary_skipped:
+                with timer.stage("copy"):
+                    clipboard_watcher.ignore(translated_text)
+                    pyperclip.copy(translated_text)
+        
+        # Remember the translations so they can be copied again or searched later
+        with timer.stage("history"):
+            detected = timer.info.get("detected", "auto")
+            for dest, (text, cached) in results.items():
+                if dest not in skipped:
+                    entry = translation_history.add(clipboard_text, text, dest=dest,
+                                                    src="auto" if detected == "unknown" else detected)
+                    if entry is not None:
+                        history_search.add(entry)
+        
+        # Update UI (applied on the Tk thread)
+        if primary_skipped:
+            if timer.info["detected"] in UNTRANSLATABLE:
+                message = "Nothing to translate (only numbers, links or code)"
+            else:
+                message = f"Already in {language_name(primary)}, nothing to translate"
+            if len(skipped) < len(dests):
+                message += "; other languages translated"
+        elif from_cache:
+            message = "Translated (from cache) and copied to clipboard!"
+        else:
+            message = "Translated and copied to clipboard!"
+        if errors:
+            message += f" ({', '.join(language_name(dest) for dest in errors)} failed)"
+        outcome = "skipped" if len(skipped) == len(dests) else "ok"
+        if streamed:
+            # The first target is already on screen
+            translations.pop(primary)
+            finish_request(timer, outcome, show_translation_result, None, translations, message)
+        else:
+            finish_request(timer, outcome, show_translation_result, clipboard_text, translations, message)
         
         # Show notification
-        if show_notification_flag:
-            # Truncate long text for notification
-            orig_preview = (clipboard_text[:25] + '...') if len(clipboard_text) > 28 else clipboard_text
-            trans_preview = (translated_text[:25] + '...') if len(translated_text) > 28 else translated_text
-            notification_text = f"Original: {orig_preview}\nTranslated: {trans_preview}"
-            show_notification("Text Translated to Japanese", notification_text)
+        if show_notification_flag and outcome == "skipped":
+            with timer.stage("notify"):
+                show_notification("Nothing to Translate", message)
+        elif show_notification_flag:
+            with timer.stage("notify"):
+                # Truncate long text for notification
+                def preview(text):
+                    return (text[:25] + '...') if len(text) > 28 else text
+                lines = [f"Original: {preview(clipboard_text)}"]
+                if len(results) == 1:
+                    lines.append(f"Translated: {preview(translated_text)}")
+                else:
+                    lines.extend(f"{dest}: {preview(text)}" for dest, (text, cached) in results.items())
+                show_notification(f"Text Translated to {target_languages_display(list(results))}", "\n".join(lines))
             
         return translated_text
+    except TranslationCancelled:
+        timer.outcome = "cancelled"
+        return None
     except Exception as e:
+        if cancelled is not None and cancelled():
+            timer.outcome = "cancelled"
+            return None
         error_msg = f"Error: {str(e)}"
+        finish_request(timer, "error", set_result_message, error_msg)
         if show_notification_flag:
-            show_notification("Translation Error", error_msg)
-        if 'root' in globals() and root.winfo_exists() and root.winfo_viewable():
-            result_label.config(text=error_msg)
+            with timer.stage("notify"):
+                show_notification("Translation Error", error_msg)
+        return None
+
+# Background worker fed by a bounded queue. Hotkey presses are turned into jobs
+# here instead of spawning a thread each; presses for clipboard content that is
+# already queued or being translated are coalesced into the existing job.
+# Every job gets a request ID. With LATEST_WINS, a new job supersedes all older
+# ones: queued ones are dropped, and in-flight ones see cancelled() turn true,
+# stop waiting on the backend and never touch the clipboard or the window.
+class TranslationWorker:
+    def __init__(self, workers=TRANSLATION_WORKERS, queue_size=TRANSLATION_QUEUE_SIZE, latest_wins=LATEST_WINS):
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._lock = threading.Lock()
+        self._active_keys = {}  # Clipboard hash -> request ID of its job
+        self.latest_wins = latest_wins
+        self.submitted = 0
+        self.coalesced = 0
+        self.dropped = 0
+        self.started = 0
+        self.completed = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.last_wait = 0.0
+        self.cancelled = 0
+        self.superseded = 0
+        self._generation = 0
+        self._last_request = 0  # Request IDs handed out so far
+        self._current_request = 0  # Oldest request still wanted
+        self._busy = 0
+        self._presses = queue.Queue()
+        self._unread = 0  # Presses whose clipboard hasn't been read yet
+        self._threads = [threading.Thread(target=self._read_presses, name="translation-clipboard", daemon=True)]
+        for i in range(max(1, workers)):
+            self._threads.append(threading.Thread(target=self._run, name=f"translation-worker-{i}", daemon=True))
+        for thread in self._threads:
+            thread.start()
+
+    # Queue a translation of the current clipboard. The clipboard is read on the
+    # reader thread, since the caller is the hotkey listener or the Tk thread and
+    # reading can block (pbpaste on macOS, a selection request on X11).
+    def submit(self, show_notification_flag=True):
+        with self._lock:
+            self._unread += 1
+        self._presses.put((show_notification_flag, StageTimer()))
+
+    def _read_presses(self):
+        while True:
+            show_notification_flag, timer = self._presses.get()
+            presses = 1
+            # Presses made before the clipboard is read would all read the same text
+            while True:
+                try:
+                    self._presses.get_nowait()
+                except queue.Empty:
+                    break
+                presses += 1
+            try:
+                with self._lock:
+                    self.coalesced += presses - 1
+                self._enqueue(show_notification_flag, timer)
+            except Exception as e:
+                print(f"Error in translation worker: {e}")
+            finally:
+                with self._lock:
+                    self._unread -= presses
+
+    # Queue a job for the clipboard text unless the newest job is already
+    # translating it. Returns False if the press was coalesced or dropped.
+    def _enqueue(self, show_notification_flag, timer):
+        try:
+            with timer.stage("paste"):
+                clipboard_text = pyperclip.paste()
+        except Exception as e:
+            print(f"Error reading clipboard: {e}")
+            return False
+        key = hashlib.sha1((clipboard_text or "").encode("utf-8", "surrogatepass")).hexdigest()
+
+        with self._lock:
+            active = self._active_keys.get(key)
+            # A press for the text the newest job is already translating changes nothing
+            if active is not None and (not self.latest_wins or active == self._last_request):
+                self.coalesced += 1
+                return False
+            if self.latest_wins:
+                self.superseded += self._drain_locked()
+            request_id = self._last_request + 1
+            try:
+                self._queue.put_nowait((key, clipboard_text, show_notification_flag, time.monotonic(),
+                                        self._generation, request_id, timer))
+            except queue.Full:
+                self.dropped += 1
+                print("Translation queue is full, dropping hotkey press")
+                return False
+            self._last_request = request_id
+            if self.latest_wins:
+                self._current_request = request_id
+            timer.info["request_id"] = request_id
+            self._active_keys[key] = request_id
+            self.submitted += 1
+        return True
+
+    # Drop queued jobs (called with the lock held). Returns how many there were.
+    def _drain_locked(self):
+        drained = 0
+        while True:
+            try:
+                job = self._queue.get_nowait()
+            except queue.Empty:
+                return drained
+            key, request_id = job[0], job[5]
+            if self._active_keys.get(key) == request_id:
+                del self._active_keys[key]
+            drained += 1
+            self._queue.task_done()
+
+    # Cancel queued jobs and make any in-flight job drop its result
+    def cancel(self):
+        with self._lock:
+            self._generation += 1
+            self.cancelled += self._drain_locked()
+
+    # Make every request so far stale, e.g. when the user puts something else
+    # on the clipboard from the window
+    def supersede(self):
+        with self._lock:
+            self.superseded += self._drain_locked()
+            self._current_request = self._last_request + 1
+
+    def is_busy(self):
+        with self._lock:
+            return self._busy > 0 or self._unread > 0 or not self._queue.empty()
+
+    # Whether a job was cancelled, or superseded by a newer one
+    def _is_cancelled(self, generation, request_id):
+        return generation != self._generation or request_id < self._current_request
+
+    def _run(self):
+        while True:
+            key, clipboard_text, show_notification_flag, queued_at, generation, request_id, timer = self._queue.get()
+            wait = time.monotonic() - queued_at
+            timer.add("queue", wait)
+            with self._lock:
+                self.started += 1
+                self.last_wait = wait
+                self.total_wait += wait
+                self.max_wait = max(self.max_wait, wait)
+                self._busy += 1
+            post_to_ui(set_busy_state, True)
+            try:
+                translate_clipboard(show_notification_flag, clipboard_text=clipboard_text,
+                                    cancelled=lambda: self._is_cancelled(generation, request_id), timer=timer)
+            except Exception as e:
+                print(f"Error in translation worker: {e}")
+            finally:
+                with self._lock:
+                    if self._active_keys.get(key) == request_id:
+                        del self._active_keys[key]
+                    if timer.outcome == "cancelled" and generation == self._generation:
+                        self.superseded += 1
+                    self.completed += 1
+                    self._busy -= 1
+                    still_busy = self._busy > 0 or self._unread > 0 or not self._queue.empty()
+                self._queue.task_done()
+                if not still_busy:
+                    post_to_ui(set_busy_state, False)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "queue_depth": self._queue.qsize(),
+                "unread_presses": self._unread,
+                "submitted": self.submitted,
+                "coalesced": self.coalesced,
+                "dropped": self.dropped,
+                "completed": self.completed,
+                "cancelled": self.cancelled,
+                "superseded": self.superseded,
+                "last_request": self._last_request,
+                "avg_wait": self.total_wait / self.started if self.started else 0.0,
+                "max_wait": self.max_wait,
+                "last_wait": self.last_wait,
+            }
+
+translation_worker = TranslationWorker()
+
+# Returns a function giving a counter that changes whenever the clipboard does,
+# or None if the platform has no cheap way to tell
+def get_clipboard_change_counter():
+    if OS_SYSTEM == "Windows":
+        try:
+            import ctypes
+            return ctypes.windll.user32.GetClipboardSequenceNumber
+        except Exception:
+            return None
+    if OS_SYSTEM == "Darwin":
+        try:
+            from AppKit import NSPasteboard
+            return NSPasteboard.generalPasteboard().changeCount
+        except Exception:
+            return None
+    return None
+
+# Opt-in clipboard watcher. Detects clipboard changes with the native change
+# counter where available (otherwise by polling a hash of the text, backing off
+# while nothing changes) and prefetches translations of new text into the cache.
+# Prefetching waits for interactive work and is abandoned when the clipboard changes again.
+class ClipboardWatcher:
+    def __init__(self):
+        self.changes = 0
+        self.prefetched = 0
+        self.prefetch_cancelled = 0
+        self.skipped = 0
+        self._generation = 0
+        self._pending = None
+        self._ignored_hash = None
+        self._condition = threading.Condition()
+        self._stop = threading.Event()
+        self._threads = []
+
+    @property
+    def running(self):
+        return bool(self._threads)
+
+    @staticmethod
+    def _hash(text):
+        return hashlib.sha1((text or "").encode("utf-8", "surrogatepass")).digest()
+
+    # Don't prefetch text we put on the clipboard ourselves (i.e. translations)
+    def ignore(self, text):
+        self._ignored_hash = self._hash(text)
+
+    def start(self):
+        if self._threads:
+            return
+        self._stop.clear()
+        self._threads = [
+            threading.Thread(target=self._poll, name="clipboard-watcher", daemon=True),
+            threading.Thread(target=self._prefetch, name="clipboard-prefetch", daemon=True),
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def stop(self):
+        self._stop.set()
+        with self._condition:
+            self._generation += 1
+            self._condition.notify_all()
+        self._threads = []
+
+    def _poll(self):
+        counter = get_clipboard_change_counter()
+        last_count = counter() if counter is not None else None
+        last_hash = None
+        try:
+            last_hash = self._hash(pyperclip.paste())
+        except Exception:
+            pass
+        interval = WATCH_MIN_INTERVAL_SECONDS
+        while not self._stop.wait(interval):
+            try:
+                if counter is not None:
+                    count = counter()
+                    if count == last_count:
+                        continue
+                    last_count = count
+                text = pyperclip.paste()
+            except Exception as e:
+                print(f"Clipboard watch error: {e}")
+                interval = WATCH_MAX_INTERVAL_SECONDS
+                continue
+            text_hash = self._hash(text)
+            if text_hash == last_hash:
+                # Poll less often while the clipboard is idle
+                interval = min(interval * 1.5, WATCH_MAX_INTERVAL_SECONDS)
+                continue
+            interval = WATCH_MIN_INTERVAL_SECONDS
+            last_hash = text_hash
+            self._on_change(text, text_hash)
+
+    def _on_change(self, text, text_hash):
+        with self._condition:
+            self.changes += 1
+            # Any prefetch still running is for stale content now
+            self._generation += 1
+            if not text or not text.strip() or len(text) > WATCH_MAX_CHARS or text_hash == self._ignored_hash:
+                self.skipped += 1
+                self._pending = None
+            else:
+                self._pending = (text, self._generation)
+            self._condition.notify_all()
+
+    def _prefetch(self):
+        while not self._stop.is_set():
+            with self._condition:
+                while self._pending is None and not self._stop.is_set():
+                    self._condition.wait()
+                if self._stop.is_set():
+                    return
+                text, generation = self._pending
+                self._pending = None
+            cancelled = lambda: generation != self._generation or self._stop.is_set()
+
+            # Let the clipboard settle, and stay out of the way of hotkey translations
+            if self._stop.wait(WATCH_DEBOUNCE_SECONDS):
+                return
+            while translation_worker.is_busy() and not cancelled():
+                time.sleep(0.05)
+            if cancelled():
+                self.prefetch_cancelled += 1
+                continue
+            try:
+                translate_to_targets(text, TARGET_LANGUAGES, cancelled=cancelled, priority=BACKGROUND)
+                self.prefetched += 1
+            except TranslationCancelled:
+                self.prefetch_cancelled += 1
+            except Exception as e:
+                print(f"Prefetch failed: {e}")
+
+    def stats(self):
+        return {
+            "changes": self.changes,
+            "prefetched": self.prefetched,
+            "prefetch_cancelled": self.prefetch_cancelled,
+            "skipped": self.skipped,
+        }
+
+clipboard_watcher = ClipboardWatcher()
+
+# The endpoint's classes are built on first use, so http.server, socketserver and
+# secrets are only imported once a server is actually started
+_translation_server_class = None
+
+def translation_server_class():
+    global _translation_server_class
+    if _translation_server_class is not None:
+        return _translation_server_class
+    http_server = timed_import("http.server")
+    socketserver = timed_import("socketserver")
+    secrets = timed_import("secrets")
+
+    # Request handler for the local translation endpoint. Every request must carry
+    # the token from the state file, which only the current user can read.
+    class TranslationRequestHandler(http_server.BaseHTTPRequestHandler):
+        server_version = "ClipboardJapaneseTranslator"
+
+        def log_message(self, format, *args):
+            pass
+
+        def _send_json(self, status, payload):
+            body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _authorized(self):
+            if secrets.compare_digest(self.headers.get("X-CJT-Token", ""), self.server.token):
+                return True
+            self._send_json(403, {"error": "forbidden"})
+            return False
+
+        def do_GET(self):
+            # Prometheus scrapes can't send the token; the metrics contain no text
+            if self.path == "/metrics":
+                body = metrics.render_prometheus().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+                return
+            if not self._authorized():
+                return
+            if self.path == "/health":
+                self._send_json(200, {"status": "ok", "pid": os.getpid(), "mode": self.server.mode})
+            elif self.path == "/stats":
+                self._send_json(200, collect_stats())
+            else:
+                self._send_json(404, {"error": "not found"})
+
+        def do_POST(self):
+            if not self._authorized():
+                return
+            try:
+                length = int(self.headers.get("Content-Length", "0"))
+                request = json.loads(self.rfile.read(length).decode("utf-8")) if length else {}
+            except ValueError:
+                self._send_json(400, {"error": "invalid JSON"})
+                return
+            if self.path == "/translate":
+                text = request.get("text")
+                if not isinstance(text, str):
+                    self._send_json(400, {"error": "'text' must be a string"})
+                    return
+                priority = request.get("priority", INTERACTIVE)
+                if priority not in PRIORITIES:
+                    self._send_json(400, {"error": f"'priority' must be one of {', '.join(PRIORITIES)}"})
+                    return
+                try:
+                    translated, from_cache = translate_with_cache(
+                        text, dest=request.get("dest", "ja"), src=request.get("src", "auto"), priority=priority)
+                except Exception as e:
+                    self._send_json(502, {"error": str(e)})
+                    return
+                self._send_json(200, {"translation": translated, "from_cache": from_cache})
+            elif self.path == "/show":
+                post_to_ui(show_main_window)
+                self._send_json(200, {"status": "ok"})
+            elif self.path == "/shutdown" and self.server.mode == "daemon":
+                self._send_json(200, {"status": "stopping"})
+                self.server.stop_requested.set()
+            else:
+                self._send_json(404, {"error": "not found"})
+
+    class TranslationServer(socketserver.ThreadingMixIn, http_server.HTTPServer):
+        daemon_threads = True
+        allow_reuse_address = True
+
+        def __init__(self, mode, port=DAEMON_PORT):
+            super().__init__((DAEMON_HOST, port), TranslationRequestHandler)
+            self.mode = mode
+            self.token = secrets.token_hex(16)
+            self.stop_requested = threading.Event()
+
+    _translation_server_class = TranslationServer
+    return TranslationServer
+
+# Serve translations to other processes on a background thread and advertise
+# the endpoint in the state file. Returns the server, or None if it couldn't start.
+def start_translation_server(mode):
+    try:
+        server = translation_server_class()(mode)
+    except (OSError, ImportError) as e:
+        print(f"Could not start local translation endpoint: {e}")
         return None
+    state = {"port": server.server_address[1], "token": server.token, "pid": os.getpid(), "mode": mode}
+    try:
+        os.makedirs(APP_DATA_DIR, exist_ok=True)
+        temp_path = DAEMON_STATE_PATH + ".tmp"
+        fd = os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "w") as state_file:
+            json.dump(state, state_file)
+        os.replace(temp_path, DAEMON_STATE_PATH)
+    except OSError as e:
+        print(f"Could not write {DAEMON_STATE_PATH}: {e}")
+        server.server_close()
+        return None
+    threading.Thread(target=server.serve_forever, name="translation-server", daemon=True).start()
+    return server
+
+def stop_translation_server(server):
+    if server is None:
+        return
+    server.shutdown()
+    server.server_close()
+    try:
+        with open(DAEMON_STATE_PATH) as state_file:
+            if json.load(state_file).get("pid") == os.getpid():
+                os.remove(DAEMON_STATE_PATH)
+    except (OSError, ValueError):
+        pass
+
+# Thin client for a running GUI or daemon instance
+class DaemonClient:
+    def __init__(self, port, token, mode=None, timeout=TRANSLATION_DEADLINE_SECONDS):
+        self.base_url = f"http://{DAEMON_HOST}:{port}"
+        self.token = token
+        self.mode = mode
+        self.timeout = timeout
+
+    def _request(self, path, payload=None, timeout=None):
+        import urllib.request
+        import urllib.error
+        data = json.dumps(payload).encode("utf-8") if payload is not None else None
+        request = urllib.request.Request(self.base_url + path, data=data, headers={
+            "X-CJT-Token": self.token,
+            "Content-Type": "application/json",
+        })
+        try:
+            with urllib.request.urlopen(request, timeout=timeout or self.timeout) as response:
+                return json.loads(response.read().decode("utf-8"))
+        except urllib.error.HTTPError as e:
+            try:
+                message = json.loads(e.read().decode("utf-8")).get("error", str(e))
+            except ValueError:
+                message = str(e)
+            raise RuntimeError(f"Translation daemon error: {message}")
+
+    def health(self, timeout=1.0):
+        return self._request("/health", timeout=timeout)
+
+    def stats(self):
+        return self._request("/stats")
+
+    def translate(self, text, dest='ja', src='auto', priority=INTERACTIVE):
+        response = self._request("/translate", {"text": text, "dest": dest, "src": src, "priority": priority})
+        return response["translation"], response.get("from_cache", False)
+
+    def show(self):
+        return self._request("/show", {})
+
+    def shutdown(self):
+        return self._request("/shutdown", {})
+
+# Connect to a running instance advertised in the state file, or return None
+def find_running_instance():
+    try:
+        with open(DAEMON_STATE_PATH) as state_file:
+            state = json.load(state_file)
+        client = DaemonClient(state["port"], state["token"], state.get("mode"))
+        health = client.health()
+    except (OSError, ValueError, KeyError, RuntimeError):
+        return None
+    if health.get("status") != "ok":
+        return None
+    client.mode = health.get("mode")
+    return client
+
+# Translation backend that forwards requests to the resident daemon, sharing its
+# warm client, cache and rate-limit budget
+class DaemonBackend(TranslationBackend):
+    name = "daemon"
+    supports_batch = True  # The daemon keeps line breaks whatever backend it uses
+    requires_network = False  # Loopback only; the daemon applies the limits itself
+
+    def __init__(self, client):
+        super().__init__()
+        self.client = client
+
+    def translate(self, text, dest='ja', src='auto'):
+        return self.client.translate(text, dest=dest, src=src)[0]
+
+# Use a running daemon as the preferred backend
+def use_daemon_backend(client):
+    global translation_backends
+    backends = {"daemon": DaemonBackend(client)}
+    backends.update(translation_backends)
+    translation_backends = backends
+
+# Snapshot of the runtime counters, served on /stats
+def collect_stats():
+    return {
+        "cache": translation_cache.stats(),
+        "worker": translation_worker.stats(),
+        "watcher": clipboard_watcher.stats(),
+        "notifications": notification_dispatcher.stats(),
+        "segment_memory": dict(segment_memory_stats),
+        "detection": detection_report(),
+        "batching": translation_batcher.stats(),
+        "history": translation_history.stats(),
+        "history_search": history_search.stats(),
+        "latency": translation_engine.latency_report(),
+        "scheduler": translation_engine.scheduler_report(),
+        "rate_limit": rate_limiter.status(),
+        "breakers": {name: backend.breaker.status() for name, backend in translation_backends.items()
+                     if backend.breaker is not None},
+        "stages": metrics.report(),
+    }
 
 # Function that gets called when hotkey is pressed
 def hotkey_handler():
     if keybind_active:
-        # Use a thread to avoid freezing the keyboard handling
-        threading.Thread(target=translate_clipboard).start()
+        # Hand off to the translation worker to avoid freezing the keyboard handling
+        translation_worker.submit()
 
 # Check if macOS accessibility permissions are granted
 def check_mac_accessibility_permissions():
@@ -151,7 +3034,7 @@ def on_mac_hotkey_press(key):
         elif hasattr(key, 'char') and key.char == 'j' and getattr(on_mac_hotkey_press, 'cmd_pressed', False):
             # Command+J detected
             if keybind_active:
-                threading.Thread(target=translate_clipboard).start()
+                translation_worker.submit()
     except Exception as e:
         # Don't print error messages for permission denied errors
         if "accessibility" not in str(e) and "trusted" not in str(e):
@@ -196,6 +3079,334 @@ def setup_mac_hotkeys():
         mac_permissions_ok = False
         return False
 
+# Thread-safe UI dispatch. Background threads must not touch Tk widgets, so they
+# post callbacks here and the Tk main loop runs them from drain_ui_queue().
+ui_queue = queue.Queue()
+ui_running = False
+
+def post_to_ui(callback, *args):
+    if ui_running:
+        ui_queue.put((callback, args))
+
+def drain_ui_queue():
+    while True:
+        try:
+            callback, args = ui_queue.get_nowait()
+        except queue.Empty:
+            break
+        try:
+            callback(*args)
+        except Exception as e:
+            print(f"Error updating UI: {e}")
+    if ui_running:
+        root.after(UI_POLL_INTERVAL_MS, drain_ui_queue)
+
+# Text widget backed by the full text as a string. Only the pages the user asked
+# for are put in the widget, a slice at a time from the Tk event loop, and
+# nothing is rendered while the pane is hidden (minimized window, other tab);
+# refresh() catches up once it is shown again.
+class TextPane:
+    def __init__(self, parent):
+        self.frame = tk.Frame(parent, bg="#f0f0f0")
+        self.widget = tk.Text(self.frame, wrap=tk.WORD, height=6)
+        self.widget.pack(fill=tk.BOTH, expand=True)
+        self.pager = tk.Frame(self.frame, bg="#f0f0f0")
+        self.pager_label = tk.Label(self.pager, text="", font=("Arial", 9), bg="#f0f0f0")
+        self.pager_label.pack(side=tk.LEFT)
+        tk.Button(self.pager, text="Show all", font=("Arial", 9), command=self.show_all).pack(side=tk.RIGHT)
+        tk.Button(self.pager, text="Show more", font=("Arial", 9), command=self.show_more).pack(side=tk.RIGHT)
+        self.length = 0
+        self._parts = []
+        self._page_end = DISPLAY_PAGE_CHARS
+        self._inserted = 0  # Characters of the text already in the widget
+        self._reset = False  # The widget still holds a previous text
+        self._job = None
+
+    # The full text; streamed segments are joined only when needed
+    def get(self):
+        if len(self._parts) > 1:
+            self._parts = ["".join(self._parts)]
+        return self._parts[0] if self._parts else ""
+
+    def _limit(self):
+        return min(self.length, self._page_end)
+
+    def set_text(self, text):
+        self._parts = [text]
+        self.length = len(text)
+        self._page_end = DISPLAY_PAGE_CHARS
+        self._inserted = 0
+        self._reset = True
+        self.refresh()
+
+    def append(self, segment):
+        self._parts.append(segment)
+        self.length += len(segment)
+        self.refresh()
+
+    def show_more(self):
+        self._page_end += DISPLAY_PAGE_CHARS
+        self.refresh()
+
+    def show_all(self):
+        self._page_end = self.length
+        self.refresh()
+
+    def refresh(self):
+        if not self.widget.winfo_viewable():
+            return
+        if self._reset:
+            self._reset = False
+            self.widget.delete(1.0, tk.END)
+            self.widget.config(wrap=tk.NONE if self.length > DISPLAY_NO_WRAP_CHARS else tk.WORD)
+        if self._inserted < self._limit() and self._job is None:
+            self._job = self.widget.after(1, self._render)
+        self._update_pager()
+
+    # Insert slices until the time budget for this turn of the event loop is used up
+    def _render(self):
+        self._job = None
+        if not self.widget.winfo_viewable() or self._reset:
+            return
+        started = time.perf_counter()
+        text = self.get()
+        limit = self._limit()
+        while self._inserted < limit and time.perf_counter() - started < DISPLAY_SLICE_BUDGET_SECONDS:
+            end = min(limit, self._inserted + DISPLAY_SLICE_CHARS)
+            self.widget.insert(tk.END, text[self._inserted:end])
+            self._inserted = end
+        if self._inserted < limit:
+            self._job = self.widget.after(1, self._render)
+        self._update_pager()
+
+    def _update_pager(self):
+        if self._limit() < self.length:
+            self.pager_label.config(text=f"Showing {self._limit():,} of {self.length:,} characters")
+            self.pager.pack(fill=tk.X)
+        else:
+            self.pager.pack_forget()
+
+# Render panes that were updated while hidden
+def refresh_text_panes():
+    original_pane.refresh()
+    for pane in translation_panes.values():
+        pane.refresh()
+
+# UI callbacks (run on the Tk thread only)
+def set_result_message(message):
+    if root.winfo_exists():
+        result_label.config(text=message)
+
+# translations maps target language -> text; source_text None leaves the original pane as is
+def show_translation_result(source_text, translations, message):
+    if root.winfo_exists():
+        if source_text is not None:
+            original_pane.set_text(source_text)
+        
+        for dest, translated_text in translations.items():
+            pane = translation_panes.get(dest)
+            if pane is not None:
+                pane.set_text(translated_text)
+        
+        result_label.config(text=message)
+
+def begin_streamed_result(source_text):
+    if root.winfo_exists():
+        original_pane.set_text(source_text)
+        for pane in translation_panes.values():
+            pane.set_text("")
+
+def append_streamed_segment(segment, done, total):
+    if root.winfo_exists():
+        translation_panes[TARGET_LANGUAGES[0]].append(segment)
+        result_label.config(text=f"Translating... {done}/{total} segments")
+
+def show_main_window():
+    root.deiconify()
+    root.lift()
+    root.focus_force()
+
+def set_busy_state(busy):
+    if busy:
+        busy_indicator.pack(pady=2, before=result_label)
+        busy_indicator.start(10)
+        cancel_button.config(state=tk.NORMAL)
+        result_label.config(text="Translating...")
+    else:
+        busy_indicator.stop()
+        busy_indicator.pack_forget()
+        cancel_button.config(state=tk.DISABLED)
+
+# Called by the Cancel button
+def cancel_translation():
+    translation_worker.cancel()
+    set_busy_state(False)
+    result_label.config(text="Translation cancelled")
+
+# Position of the "Copy Previous" button in the history, and the history
+# size it refers to (a new translation starts again from the latest one)
+history_cursor = 0
+history_cursor_added = -1
+
+# Called by the "Copy Previous" button: each press puts the next older
+# translation back on the clipboard, straight from the history
+def copy_previous_translation():
+    global history_cursor, history_cursor_added
+    if history_cursor_added != translation_history.added:
+        history_cursor, history_cursor_added = 0, translation_history.added
+    entry = translation_history.nth(history_cursor + 1, dest=TARGET_LANGUAGES[0])
+    if entry is None:
+        result_label.config(text="No earlier translations in the history")
+        return
+    history_cursor += 1
+    # A translation still in flight must not overwrite this afterwards
+    translation_worker.supersede()
+    with clipboard_write_lock:
+        clipboard_watcher.ignore(entry.translation)
+        pyperclip.copy(entry.translation)
+    translated_at = time.strftime("%Y-%m-%d %H:%M", time.localtime(entry.timestamp))
+    show_translation_result(entry.source, {entry.dest: entry.translation},
+                            f"Copied the translation from {translated_at} to the clipboard")
+
+# Entries listed under the history search box, in display order
+search_matches = []
+search_job = None
+# Queries run on their own thread so a slow scan never blocks the window; only
+# the results of the newest query are shown
+search_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="history-search")
+search_generation = 0
+
+# One line of the search results: when, the source and its translation
+def history_preview(entry, width=36):
+    def clip(text):
+        text = " ".join(text[:width * 2].split())
+        return (text[:width] + "...") if len(text) > width else text
+    translated_at = time.strftime("%m-%d %H:%M", time.localtime(entry.timestamp))
+    return f"{translated_at}  {clip(entry.source)}  →  {clip(entry.translation)}"
+
+# Called on every change of the search box; searches once typing pauses briefly
+def schedule_history_search(*args):
+    global search_job
+    if search_job is not None:
+        root.after_cancel(search_job)
+    search_job = root.after(SEARCH_DEBOUNCE_MS, run_history_search)
+
+def run_history_search():
+    global search_job, search_matches, search_generation
+    search_job = None
+    search_generation += 1
+    generation = search_generation
+    query = search_var.get()
+    if not query.strip():
+        search_matches = []
+        search_results.delete(0, tk.END)
+        search_results.pack_forget()
+        return
+
+    def search():
+        # A newer query was typed while this one was queued
+        if generation != search_generation:
+            return
+        started = time.perf_counter()
+        matches = history_search.search(query)
+        post_to_ui(show_history_search_results, generation, matches, time.perf_counter() - started)
+
+    search_executor.submit(search)
+
+def show_history_search_results(generation, matches, elapsed):
+    global search_matches
+    if generation != search_generation:
+        return
+    search_matches = matches
+    search_results.delete(0, tk.END)
+    for entry in search_matches:
+        search_results.insert(tk.END, history_preview(entry))
+    search_results.pack(fill=tk.X, pady=(2, 0))
+    count = f"{len(search_matches)}+" if len(search_matches) >= SEARCH_RESULT_LIMIT else len(search_matches)
+    result_label.config(text=f"{count} matches in the history ({elapsed * 1000:.0f} ms)")
+
+# Selecting a search result shows it in the panes
+def show_search_result(event=None):
+    selection = search_results.curselection()
+    if selection and selection[0] < len(search_matches):
+        entry = search_matches[selection[0]]
+        translated_at = time.strftime("%Y-%m-%d %H:%M", time.localtime(entry.timestamp))
+        show_translation_result(entry.source, {entry.dest: entry.translation},
+                                f"Translation from {translated_at} (double-click to copy)")
+
+# Double-clicking (or pressing Enter on) a search result copies its translation
+def copy_search_result(event=None):
+    selection = search_results.curselection()
+    if selection and selection[0] < len(search_matches):
+        entry = search_matches[selection[0]]
+        translation_worker.supersede()
+        with clipboard_write_lock:
+            clipboard_watcher.ignore(entry.translation)
+            pyperclip.copy(entry.translation)
+        result_label.config(text="Copied the translation from the history to the clipboard")
+
+# Translation service status line: breaker state and request budget
+def refresh_service_status():
+    google = translation_backends.get("google")
+    budget = rate_limiter.status()
+    text = f"Translation service: OK, budget {budget['available']}/{budget['capacity']}"
+    color = "#007700"
+    if google is not None and google.breaker is not None:
+        breaker = google.breaker.status()
+        if breaker["state"] == CircuitBreaker.OPEN:
+            text = f"Translation service: paused after errors, retrying in {breaker['retry_in']:.0f}s"
+            color = "#CC0000"
+        elif breaker["state"] == CircuitBreaker.HALF_OPEN:
+            text = "Translation service: checking if it has recovered..."
+            color = "#CC7700"
+    if budget["available"] == 0 and color == "#007700":
+        text = f"Translation service: request budget used up ({budget['capacity']} per burst)"
+        color = "#CC7700"
+    service_status_label.config(text=text, fg=color)
+    root.after(1000, refresh_service_status)
+
+# Stages shown in the performance stats panel, in pipeline order
+STATS_PANEL_STAGES = ("queue", "paste", "translate", "copy", "ui", "notify", "total")
+
+# Refresh the performance stats panel while it is shown
+def refresh_stats_panel():
+    if not stats_var.get():
+        return
+    report = metrics.report()
+    lines = [f"{'stage':<10}{'n':>6}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}"]
+    for stage in STATS_PANEL_STAGES:
+        row = report.get(stage)
+        if row:
+            lines.append(f"{stage:<10}{row['count']:>6}{row['p50'] * 1000:>10.1f}"
+                         f"{row['p95'] * 1000:>10.1f}{row['p99'] * 1000:>10.1f}")
+    cache = translation_cache.stats()
+    lines.append(f"cache: {cache['hits']} hits, {cache['misses']} misses")
+    detection = detection_report()
+    lines.append(f"skipped locally: {detection['skipped_same_language']} already translated, "
+                 f"{detection['skipped_untranslatable']} nothing to translate")
+    scheduler = translation_engine.scheduler_report()
+    if scheduler:
+        lines.append("queue wait p95: " + ", ".join(
+            f"{priority} {scheduler[priority]['p95'] * 1000:.0f} ms ({scheduler[priority]['queued']} queued)"
+            for priority in PRIORITIES))
+    stats_text.config(text="\n".join(lines))
+    root.after(1000, refresh_stats_panel)
+
+# Called by the "Show performance stats" checkbox
+def toggle_stats_panel():
+    if stats_var.get():
+        stats_frame.pack(fill=tk.X, pady=5, before=result_label)
+        refresh_stats_panel()
+    else:
+        stats_frame.pack_forget()
+
+# Called by the "Watch clipboard" checkbox
+def toggle_clipboard_watch():
+    if watch_var.get():
+        clipboard_watcher.start()
+    else:
+        clipboard_watcher.stop()
+
 # Function to toggle the hotkey on/off
 def toggle_hotkey():
     global keybind_active
@@ -247,202 +3458,662 @@ def exit_app():
     except Exception as e:
         print(f"Error releasing keyboard hooks: {e}")
     
+    clipboard_watcher.stop()
+    notification_dispatcher.stop()
+    stop_translation_server(translation_server)
+    reset_translator()
+    global ui_running
+    ui_running = False
+    translation_cache.close()
+    translation_history.close()
+    history_search.close()
     root.destroy()
     sys.exit()
 
-# Create the main window
-root = tk.Tk()
-root.title("Clipboard Japanese Translator")
-root.geometry("600x550")
-root.configure(bg="#f0f0f0")
-root.protocol("WM_DELETE_WINDOW", exit_app)  # Handle window close event
+# Build the main window and its widgets
+def build_gui():
+    global root, status_var, original_pane, translation_panes, translate_button, toggle_button
+    global cancel_button, result_label, busy_indicator, retry_button, watch_var, ui_running
+    global stats_var, stats_frame, stats_text, service_status_label, search_var, search_results
+    
+    # Create the main window
+    root = tk.Tk()
+    root.title("Clipboard Japanese Translator")
+    root.geometry("600x550")
+    root.configure(bg="#f0f0f0")
+    root.protocol("WM_DELETE_WINDOW", exit_app)  # Handle window close event
 
-# Add NSApplicationSupportsSecureRestorableState flag to silence warning
-if OS_SYSTEM == "Darwin":
-    try:
-        # This silences the warning about secure coding for restorable state on macOS
-        root.createcommand('::tk::mac::NSApplicationSupportsSecureRestorableState', lambda: 1)
-    except Exception as e:
-        # Ignore if this fails, it's just to silence a warning
-        print(f"Note: Could not set NSApplicationSupportsSecureRestorableState: {e}")
+    # Add NSApplicationSupportsSecureRestorableState flag to silence warning
+    if OS_SYSTEM == "Darwin":
+        try:
+            # This silences the warning about secure coding for restorable state on macOS
+            root.createcommand('::tk::mac::NSApplicationSupportsSecureRestorableState', lambda: 1)
+        except Exception as e:
+            # Ignore if this fails, it's just to silence a warning
+            print(f"Note: Could not set NSApplicationSupportsSecureRestorableState: {e}")
     
-    # Additional Mac-specific UI tweaks
+        # Additional Mac-specific UI tweaks
+        try:
+            # Set app name in menu bar (macOS)
+            root.createcommand('::tk::mac::Preferences', lambda: None)  # Disable preferences menu item
+            root.option_add('*tearOff', False)  # Disable tear-off menus
+        except:
+            pass  # Ignore errors, these are just UI enhancements
+
+    # Create a frame for better organization
+    main_frame = tk.Frame(root, bg="#f0f0f0", padx=20, pady=20)
+    main_frame.pack(fill=tk.BOTH, expand=True)
+
+    # Title label
+    title_label = tk.Label(
+        main_frame, 
+        text=f"Clipboard to {target_languages_display()} Translator", 
+        font=("Arial", 16, "bold"),
+        bg="#f0f0f0"
+    )
+    title_label.pack(pady=10)
+
+    # Instructions
+    instructions = tk.Label(
+        main_frame,
+        text=f"Press {HOTKEY_DISPLAY} anywhere to translate text from clipboard\nor click 'Translate' button below.",
+        font=("Arial", 10),
+        bg="#f0f0f0",
+        justify=tk.CENTER
+    )
+    instructions.pack(pady=5)
+
+    # Hotkey status
+    status_var = tk.StringVar(value=f"Hotkey status: {'Active' if keybind_active else 'Disabled'}")
+    status_label = tk.Label(
+        main_frame,
+        textvariable=status_var,
+        font=("Arial", 9),
+        bg="#f0f0f0",
+        fg="#007700"
+    )
+    status_label.pack(pady=2)
+
+    # Translation service status (circuit breaker and rate limit budget)
+    service_status_label = tk.Label(main_frame, text="", font=("Arial", 9), bg="#f0f0f0", fg="#007700")
+    service_status_label.pack(pady=2)
+    refresh_service_status()
+
+    # Clipboard watch mode toggle
+    watch_var = tk.BooleanVar(value=clipboard_watcher.running)
+    watch_checkbox = tk.Checkbutton(
+        main_frame,
+        text="Watch clipboard and translate new text in the background",
+        variable=watch_var,
+        command=toggle_clipboard_watch,
+        font=("Arial", 9),
+        bg="#f0f0f0"
+    )
+    watch_checkbox.pack(pady=2)
+
+    # History search: results appear under the box as you type
+    search_frame = tk.Frame(main_frame, bg="#f0f0f0")
+    search_frame.pack(fill=tk.X, pady=(5, 0))
+    search_row = tk.Frame(search_frame, bg="#f0f0f0")
+    search_row.pack(fill=tk.X)
+    tk.Label(search_row, text="Search history:", font=("Arial", 9), bg="#f0f0f0").pack(side=tk.LEFT)
+    search_var = tk.StringVar()
+    search_var.trace_add("write", schedule_history_search)
+    search_entry = tk.Entry(search_row, textvariable=search_var)
+    search_entry.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=5)
+    search_entry.bind("<Escape>", lambda event: search_var.set(""))
+    search_results = tk.Listbox(search_frame, height=5, font=("Arial", 9), activestyle="none")
+    search_results.bind("<<ListboxSelect>>", show_search_result)
+    search_results.bind("<Double-Button-1>", copy_search_result)
+    search_results.bind("<Return>", copy_search_result)
+    # Shown once there is a query
+
+    # Original text frame
+    original_frame = tk.LabelFrame(main_frame, text="Original Text", bg="#f0f0f0", padx=10, pady=10)
+    original_frame.pack(fill=tk.BOTH, expand=True, pady=10)
+
+    original_pane = TextPane(original_frame)
+    original_pane.frame.pack(fill=tk.BOTH, expand=True)
+
+    # Translated text frame: one pane, or a tab per language with several targets
+    translation_panes = OrderedDict()
+    if len(TARGET_LANGUAGES) == 1:
+        translated_frame = tk.LabelFrame(main_frame, text=f"{language_name(TARGET_LANGUAGES[0])} Translation",
+                                         bg="#f0f0f0", padx=10, pady=10)
+        translated_frame.pack(fill=tk.BOTH, expand=True, pady=10)
+        translation_panes[TARGET_LANGUAGES[0]] = TextPane(translated_frame)
+        translation_panes[TARGET_LANGUAGES[0]].frame.pack(fill=tk.BOTH, expand=True)
+    else:
+        translated_frame = tk.LabelFrame(main_frame, text="Translations", bg="#f0f0f0", padx=10, pady=10)
+        translated_frame.pack(fill=tk.BOTH, expand=True, pady=10)
+        translation_tabs = ttk.Notebook(translated_frame)
+        translation_tabs.pack(fill=tk.BOTH, expand=True)
+        for dest in TARGET_LANGUAGES:
+            translation_panes[dest] = TextPane(translation_tabs)
+            translation_tabs.add(translation_panes[dest].frame, text=language_name(dest))
+
+    # Catch up on panes updated while hidden: root's binding also sees its
+    # children's events, so this covers restoring the window and switching tabs
+    root.bind("<Map>", lambda event: refresh_text_panes(), add="+")
+
+    # Button frame
+    button_frame = tk.Frame(main_frame, bg="#f0f0f0")
+    button_frame.pack(pady=10)
+
+    # Translate button
+    translate_button = tk.Button(
+        button_frame,
+        text="Translate Clipboard",
+        command=lambda: translation_worker.submit(),
+        font=("Arial", 12),
+        bg="#4CAF50",
+        fg="white",
+        padx=10,
+        pady=5
+    )
+    translate_button.pack(side=tk.LEFT, padx=5)
+
+    # Toggle hotkey button
+    toggle_button = tk.Button(
+        button_frame,
+        text=f"Disable {HOTKEY_DISPLAY} Hotkey",
+        command=toggle_hotkey,
+        font=("Arial", 12),
+        bg="#FF9800",
+        fg="white",
+        padx=10,
+        pady=5
+    )
+
+    # Cancel button (enabled while a translation is running)
+    cancel_button = tk.Button(
+        button_frame,
+        text="Cancel",
+        command=cancel_translation,
+        font=("Arial", 12),
+        bg="#9E9E9E",
+        fg="white",
+        padx=10,
+        pady=5,
+        state=tk.DISABLED
+    )
+    cancel_button.pack(side=tk.LEFT, padx=5)
+
+    # Copy an earlier translation from the history without translating again
+    previous_button = tk.Button(
+        button_frame,
+        text="Copy Previous",
+        command=copy_previous_translation,
+        font=("Arial", 12),
+        bg="#607D8B",
+        fg="white",
+        padx=10,
+        pady=5
+    )
+    previous_button.pack(side=tk.LEFT, padx=5)
+
+    # Only display the toggle button if hotkeys are available
+    if not (OS_SYSTEM == "Darwin" and not mac_permissions_ok):
+        toggle_button.pack(side=tk.LEFT, padx=5)
+    else:
+        # Update status label to show permissions are needed
+        status_var.set("Hotkey status: Permissions required")
+
+    # Result label
+    result_label = tk.Label(main_frame, text="", font=("Arial", 10), bg="#f0f0f0")
+    result_label.pack(pady=5)
+
+    # Performance stats panel (hidden until enabled)
+    stats_var = tk.BooleanVar(value=False)
+    stats_checkbox = tk.Checkbutton(
+        main_frame,
+        text=f"Show performance stats (last {METRICS_WINDOW} requests)",
+        variable=stats_var,
+        command=toggle_stats_panel,
+        font=("Arial", 9),
+        bg="#f0f0f0"
+    )
+    stats_checkbox.pack(pady=2, before=result_label)
+    stats_frame = tk.LabelFrame(main_frame, text="Performance", bg="#f0f0f0", padx=10, pady=5)
+    stats_text = tk.Label(stats_frame, text="", font=("Courier", 9), bg="#f0f0f0", justify=tk.LEFT, anchor="w")
+    stats_text.pack(fill=tk.X)
+
+    # Busy indicator (shown while a translation is running)
+    busy_indicator = ttk.Progressbar(main_frame, mode="indeterminate", length=200)
+
+    # Start applying UI updates posted by background threads
+    ui_running = True
+    root.after(UI_POLL_INTERVAL_MS, drain_ui_queue)
+
+    # Permission retry button for macOS (initially hidden)
+    retry_button = tk.Button(
+        main_frame,
+        text="Retry After Granting Permissions",
+        command=lambda: restart_mac_permissions(),
+        font=("Arial", 10, "bold"),
+        bg="#2196F3",
+        fg="white",
+        padx=10,
+        pady=5
+    )
+    # Will be packed only if needed
+
+# Register the platform hotkey and show the startup message
+def register_hotkeys(show_startup_dialog=True):
     try:
-        # Set app name in menu bar (macOS)
-        root.createcommand('::tk::mac::Preferences', lambda: None)  # Disable preferences menu item
-        root.option_add('*tearOff', False)  # Disable tear-off menus
-    except:
-        pass  # Ignore errors, these are just UI enhancements
-
-# Create a frame for better organization
-main_frame = tk.Frame(root, bg="#f0f0f0", padx=20, pady=20)
-main_frame.pack(fill=tk.BOTH, expand=True)
-
-# Title label
-title_label = tk.Label(
-    main_frame, 
-    text="Clipboard to Japanese Translator", 
-    font=("Arial", 16, "bold"),
-    bg="#f0f0f0"
-)
-title_label.pack(pady=10)
-
-# Instructions
-instructions = tk.Label(
-    main_frame,
-    text=f"Press {HOTKEY_DISPLAY} anywhere to translate text from clipboard\nor click 'Translate' button below.",
-    font=("Arial", 10),
-    bg="#f0f0f0",
-    justify=tk.CENTER
-)
-instructions.pack(pady=5)
-
-# Hotkey status
-status_var = tk.StringVar(value=f"Hotkey status: {'Active' if keybind_active else 'Disabled'}")
-status_label = tk.Label(
-    main_frame,
-    textvariable=status_var,
-    font=("Arial", 9),
-    bg="#f0f0f0",
-    fg="#007700"
-)
-status_label.pack(pady=2)
-
-# Original text frame
-original_frame = tk.LabelFrame(main_frame, text="Original Text", bg="#f0f0f0", padx=10, pady=10)
-original_frame.pack(fill=tk.BOTH, expand=True, pady=10)
-
-original_text = tk.Text(original_frame, wrap=tk.WORD, height=6)
-original_text.pack(fill=tk.BOTH, expand=True)
-
-# Translated text frame
-translated_frame = tk.LabelFrame(main_frame, text="Japanese Translation", bg="#f0f0f0", padx=10, pady=10)
-translated_frame.pack(fill=tk.BOTH, expand=True, pady=10)
-
-translated_display = tk.Text(translated_frame, wrap=tk.WORD, height=6)
-translated_display.pack(fill=tk.BOTH, expand=True)
-
-# Button frame
-button_frame = tk.Frame(main_frame, bg="#f0f0f0")
-button_frame.pack(pady=10)
-
-# Translate button
-translate_button = tk.Button(
-    button_frame,
-    text="Translate Clipboard",
-    command=lambda: translate_clipboard(),
-    font=("Arial", 12),
-    bg="#4CAF50",
-    fg="white",
-    padx=10,
-    pady=5
-)
-translate_button.pack(side=tk.LEFT, padx=5)
-
-# Toggle hotkey button
-toggle_button = tk.Button(
-    button_frame,
-    text=f"Disable {HOTKEY_DISPLAY} Hotkey",
-    command=toggle_hotkey,
-    font=("Arial", 12),
-    bg="#FF9800",
-    fg="white",
-    padx=10,
-    pady=5
-)
-
-# Only display the toggle button if hotkeys are available
-if not (OS_SYSTEM == "Darwin" and not mac_permissions_ok):
-    toggle_button.pack(side=tk.LEFT, padx=5)
-else:
-    # Update status label to show permissions are needed
-    status_var.set("Hotkey status: Permissions required")
-
-# Result label
-result_label = tk.Label(main_frame, text="", font=("Arial", 10), bg="#f0f0f0")
-result_label.pack(pady=5)
-
-# Permission retry button for macOS (initially hidden)
-retry_button = tk.Button(
-    main_frame,
-    text="Retry After Granting Permissions",
-    command=lambda: restart_mac_permissions(),
-    font=("Arial", 10, "bold"),
-    bg="#2196F3",
-    fg="white",
-    padx=10,
-    pady=5
-)
-# Will be packed only if needed
-
-# Platform-specific setup and messaging
-try:
-    if OS_SYSTEM == "Windows":
-        # Register Windows global hotkey
-        keyboard.add_hotkey('ctrl+j', hotkey_handler)
-        print("Windows hotkey Ctrl+J registered successfully")
-        startup_message = "The application is now running!\n\nPress Ctrl+J from anywhere to translate text in your clipboard to Japanese."
+        if OS_SYSTEM == "Windows":
+            # Register Windows global hotkey
+            keyboard.add_hotkey('ctrl+j', hotkey_handler)
+            print("Windows hotkey Ctrl+J registered successfully")
+            startup_message = f"The application is now running!\n\nPress Ctrl+J from anywhere to translate text in your clipboard to {target_languages_display()}."
     
-    elif OS_SYSTEM == "Darwin":  # macOS
-        # Setup Mac global hotkeys
-        try:
-            if not PYNPUT_AVAILABLE:
-                print("pynput module not available on macOS, running in fallback mode")
-                startup_message = ("Running in limited mode - hotkeys not available.\n\n"
-                                  "The pynput module couldn't be loaded. This can happen if:\n"
-                                  "- You're running from a virtual environment\n"
-                                  "- The module isn't installed correctly\n\n"
-                                  "You can still use the 'Translate Clipboard' button, "
-                                  "but hotkeys won't be available.")
-                # Don't show retry button since pynput isn't available at all
-            else:
-                hotkey_setup_success = setup_mac_hotkeys()
-                
-                if hotkey_setup_success:
-                    print("Mac hotkey ⌘+J listener started successfully")
-                    startup_message = "The application is now running!\n\nPress ⌘+J (Command+J) from anywhere to translate text in your clipboard to Japanese."
+        elif OS_SYSTEM == "Darwin":  # macOS
+            # Setup Mac global hotkeys
+            try:
+                if not PYNPUT_AVAILABLE:
+                    print("pynput module not available on macOS, running in fallback mode")
+                    startup_message = ("Running in limited mode - hotkeys not available.\n\n"
+                                      "The pynput module couldn't be loaded. This can happen if:\n"
+                                      "- You're running from a virtual environment\n"
+                                      "- The module isn't installed correctly\n\n"
+                                      "You can still use the 'Translate Clipboard' button, "
+                                      "but hotkeys won't be available.")
+                    # Don't show retry button since pynput isn't available at all
                 else:
-                    print("Failed to register Mac hotkeys due to permissions")
-                    startup_message = ("Accessibility Permissions Required\n\n"
-                                      "To use keyboard shortcuts, this app needs accessibility permissions:\n"
-                                      "1. Open System Preferences > Security & Privacy > Privacy\n"
-                                      "2. Select 'Accessibility' from the sidebar\n"
-                                      "3. Click the lock icon and enter your password\n"
-                                      "4. Add and check this application\n"
-                                      "5. Click the 'Retry After Granting Permissions' button\n\n"
-                                      "Until then, you can still use the 'Translate Clipboard' button.")
+                    hotkey_setup_success = setup_mac_hotkeys()
+                
+                    if hotkey_setup_success:
+                        print("Mac hotkey ⌘+J listener started successfully")
+                        startup_message = f"The application is now running!\n\nPress ⌘+J (Command+J) from anywhere to translate text in your clipboard to {target_languages_display()}."
+                    else:
+                        print("Failed to register Mac hotkeys due to permissions")
+                        startup_message = ("Accessibility Permissions Required\n\n"
+                                          "To use keyboard shortcuts, this app needs accessibility permissions:\n"
+                                          "1. Open System Preferences > Security & Privacy > Privacy\n"
+                                          "2. Select 'Accessibility' from the sidebar\n"
+                                          "3. Click the lock icon and enter your password\n"
+                                          "4. Add and check this application\n"
+                                          "5. Click the 'Retry After Granting Permissions' button\n\n"
+                                          "Until then, you can still use the 'Translate Clipboard' button.")
                     
-                    # Show retry button
-                    retry_button.pack(pady=10, before=result_label)
-        except Exception as e:
-            print(f"Error setting up Mac hotkeys: {e}")
-            startup_message = ("Error setting up keyboard shortcuts.\n\n"
-                               "You can still use the 'Translate Clipboard' button.\n\n"
-                               f"Error details: {str(e)}")
+                        # Show retry button
+                        retry_button.pack(pady=10, before=result_label)
+            except Exception as e:
+                print(f"Error setting up Mac hotkeys: {e}")
+                startup_message = ("Error setting up keyboard shortcuts.\n\n"
+                                   "You can still use the 'Translate Clipboard' button.\n\n"
+                                   f"Error details: {str(e)}")
             
-            # Show retry button
-            retry_button.pack(pady=10, before=result_label)
+                # Show retry button
+                retry_button.pack(pady=10, before=result_label)
+    
+        else:  # Linux or other platforms
+            print("Hotkeys not supported on this platform")
+            startup_message = f"The application is now running!\n\nUse the Translate button to translate text in your clipboard to {target_languages_display()}.\n\nNote: Global hotkeys are not supported on this platform."
+
+        record_startup_event("milestone", "hotkey ready")
+        
+        # Display a startup message
+        if show_startup_dialog:
+            show_startup_message("Hotkey Registered", startup_message)
     
-    else:  # Linux or other platforms
-        print("Hotkeys not supported on this platform")
-        startup_message = "The application is now running!\n\nUse the Translate button to translate text in your clipboard to Japanese.\n\nNote: Global hotkeys are not supported on this platform."
+    except Exception as e:
+        error_message = f"Could not register hotkey: {str(e)}"
+        print(error_message)
+        if show_startup_dialog:
+            show_startup_message("Error", error_message)
+        else:
+            result_label.config(text=error_message)
+
+# Non-modal startup message, so the app is usable while it is on screen
+def show_startup_message(title, message):
+    dialog = tk.Toplevel(root)
+    dialog.title(title)
+    dialog.configure(bg="#f0f0f0")
+    dialog.resizable(False, False)
+    dialog.transient(root)
+    tk.Label(dialog, text=message, justify=tk.LEFT, bg="#f0f0f0", padx=20, pady=15, wraplength=420).pack()
+    tk.Button(dialog, text="OK", width=10, command=dialog.destroy).pack(pady=(0, 15))
+    dialog.bind("<Return>", lambda event: dialog.destroy())
+    dialog.bind("<Escape>", lambda event: dialog.destroy())
+
+# Load the translation client, engine and cache in the background once the
+# window is up, so the first hotkey press doesn't pay for it. The local endpoint
+# for other processes is started here too when start_server is set.
+def warm_up_translation(start_server=False):
+    def warm_up():
+        global translation_server
+        if start_server:
+            translation_server = start_translation_server("gui")
+            record_startup_event("milestone", "endpoint listening")
+        try:
+            translator = get_translator()
+            translation_engine._ensure_started()
+            translation_cache.open()
+            # Open a pooled connection to the translation service ahead of time
+            translator.client.head("https://translate.google.com")
+        except Exception as e:
+            print(f"Background warm-up failed: {e}")
+        # Index history left by sessions from before the search index existed
+        history_search.backfill(translation_history)
+        record_startup_event("milestone", "translator warm")
+        if startup_timing_requested:
+            print_startup_timing()
+    
+    threading.Thread(target=warm_up, name="warm-up", daemon=True).start()
+
+# Report startup milestones and deferred import times (like python -X importtime)
+def print_startup_timing():
+    lines = ["Startup timing (ms since launch):",
+             f"  {'kind':<10} {'name':<24} {'at':>9} {'took':>9}"]
+    for kind, name, at, took in sorted(startup_timings, key=lambda event: event[2]):
+        took_text = f"{took:9.1f}" if took is not None else f"{'':>9}"
+        lines.append(f"  {kind:<10} {name:<24} {at:9.1f} {took_text}")
+    print("\n".join(lines), file=sys.stderr)
 
-    # Display a startup message
-    messagebox.showinfo("Hotkey Registered", startup_message)
+# Run the desktop application
+def run_gui(show_startup_dialog=True):
+    record_startup_event("milestone", "core loaded")
     
-except Exception as e:
-    error_message = f"Could not register hotkey: {str(e)}"
-    print(error_message)
-    messagebox.showerror("Error", error_message)
-
-# Safer exception handling for main event loop
-try:
-    # Exit the application
-    root.mainloop()
-except Exception as e:
-    print(f"Error in main application loop: {e}")
+    # Only one window per user: bring an already running one to the front instead
+    existing = find_running_instance()
+    if existing is not None and existing.mode == "gui":
+        print("Clipboard Japanese Translator is already running")
+        try:
+            existing.show()
+        except Exception as e:
+            print(f"Could not reach the running instance: {e}")
+        return
+    if existing is not None:
+        print("Using the running translation daemon")
+        use_daemon_backend(existing)
+    
+    build_gui()
+    record_startup_event("milestone", "window built")
+    register_hotkeys(show_startup_dialog)
+    root.after_idle(lambda: record_startup_event("milestone", "event loop running"))
+    root.after(100, warm_up_translation, existing is None)
+    
+    # Safer exception handling for main event loop
     try:
-        import traceback
-        traceback.print_exc()
-    except:
-        pass
\ No newline at end of file
+        # Exit the application
+        root.mainloop()
+    except Exception as e:
+        print(f"Error in main application loop: {e}")
+        try:
+            import traceback
+            traceback.print_exc()
+        except:
+            pass
+
+# Files picked up when a directory is given to the command line translator
+CLI_INPUT_EXTENSIONS = (".txt", ".jsonl", ".ndjson")
+
+# Yield (label, text, record, error) for every item to translate. Plain text inputs
+# give one item per line; JSONL inputs give one item per object, taking the text
+# from `field`. Inputs are read lazily so huge catalogs are never held in memory.
+# A line that cannot be decoded or parsed, or a file that cannot be opened, is
+# yielded with an error message instead of ending the whole job.
+def iter_cli_items(paths, input_format="auto", field="text"):
+    def read_stream(stream, label, fmt):
+        # Lines are decoded one at a time so a bad byte only costs its own line
+        for line_number, line in enumerate(stream, 1):
+            item_label = f"{label}:{line_number}"
+            if isinstance(line, bytes):
+                try:
+                    line = line.decode("utf-8")
+                except UnicodeDecodeError as e:
+                    yield item_label, line.decode("utf-8", "replace").rstrip("\r\n"), None, f"Invalid UTF-8: {e}"
+                    continue
+            line = line.rstrip("\r\n")
+            if fmt == "jsonl":
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                except ValueError as e:
+                    yield item_label, line, None, f"Invalid JSON: {e}"
+                    continue
+                if not isinstance(record, dict):
+                    yield item_label, line, None, "Invalid JSON: expected an object"
+                    continue
+                yield item_label, str(record.get(field, "")), record, None
+            else:
+                yield item_label, line, None, None
+
+    def format_for(path):
+        if input_format != "auto":
+            return input_format
+        return "jsonl" if path.lower().endswith((".jsonl", ".ndjson")) else "lines"
+
+    if not paths:
+        fmt = "lines" if input_format == "auto" else input_format
+        yield from read_stream(getattr(sys.stdin, "buffer", sys.stdin), "<stdin>", fmt)
+        return
+
+    for path in paths:
+        if os.path.isdir(path):
+            files = []
+            for directory, subdirectories, filenames in os.walk(path):
+                subdirectories[:] = sorted(name for name in subdirectories if not name.startswith("."))
+                files.extend(os.path.join(directory, filename) for filename in sorted(filenames)
+                             if filename.lower().endswith(CLI_INPUT_EXTENSIONS))
+        else:
+            files = [path]
+        for file_path in files:
+            try:
+                stream = open(file_path, "rb")
+            except OSError as e:
+                yield file_path, "", None, str(e)
+                continue
+            with stream:
+                yield from read_stream(stream, file_path, format_for(file_path))
+
+# Periodic progress and throughput report on stderr
+class CliProgress:
+    def __init__(self, quiet=False, interval=1.0):
+        self.quiet = quiet
+        self.interval = interval
+        self.items = 0
+        self.chars = 0
+        self.cached = 0
+        self.failed = 0
+        self.started = time.monotonic()
+        self._last_report = self.started
+
+    def update(self, text, from_cache, failed):
+        self.items += 1
+        self.chars += len(text)
+        self.cached += 1 if from_cache else 0
+        self.failed += 1 if failed else 0
+        now = time.monotonic()
+        if now - self._last_report >= self.interval:
+            self._last_report = now
+            self.report(end="\r")
+
+    def report(self, end="\n"):
+        if self.quiet:
+            return
+        elapsed = max(time.monotonic() - self.started, 1e-9)
+        sys.stderr.write(f"{self.items} items ({self.cached} cached, {self.failed} failed), "
+                         f"{self.items / elapsed:.1f} items/s, {self.chars / elapsed:.0f} chars/s{end}")
+        sys.stderr.flush()
+
+# Translate files, directories or stdin without the GUI. Items are translated in
+# parallel with a bounded window of in-flight work, and results are written in
+# input order as soon as they are ready.
+def run_cli_translate(args):
+    jobs = max(1, args.jobs)
+    if translation_engine._loop is None:
+        # Nothing interactive runs in this process, so no slots are held back for it
+        translation_engine.concurrency = jobs
+        translation_engine.interactive_slots = 0
+    for stream in (sys.stdin, sys.stdout):
+        try:
+            stream.reconfigure(encoding="utf-8")
+        except (AttributeError, ValueError):
+            pass
+
+    output_format = args.output_format or ("jsonl" if args.input_format == "jsonl" else "text")
+    out = open(args.output, "w", encoding="utf-8", newline="\n") if args.output else sys.stdout
+    progress = CliProgress(quiet=args.quiet)
+
+    # Share the warm client and cache of a running instance when there is one
+    daemon = None if args.no_daemon else find_running_instance()
+    if daemon is not None and not args.quiet:
+        print(f"Using the running translator instance ({daemon.mode})", file=sys.stderr)
+
+    def translate_item(text):
+        if not text.strip():
+            return text, True
+        if daemon is not None:
+            return daemon.translate(text, dest=args.dest, src=args.src, priority=BACKGROUND)
+        return translate_with_cache(text, dest=args.dest, src=args.src, priority=BACKGROUND)
+
+    def write_result(label, text, record, future):
+        error = None
+        try:
+            translated, from_cache = future.result()
+        except Exception as e:
+            translated, from_cache, error = "", False, str(e)
+            print(f"{label}: {error}", file=sys.stderr)
+        if output_format == "jsonl":
+            if record is None:
+                record = {"source": label, "text": text}
+            record["translation"] = translated
+            if error is not None:
+                record["error"] = error
+            out.write(json.dumps(record, ensure_ascii=False) + "\n")
+        else:
+            out.write(translated.replace("\n", " ") + "\n")
+        progress.update(text, from_cache, error is not None)
+
+    # With batching most threads just wait for their line of a batched request;
+    # the engine still makes at most `jobs` backend calls at a time
+    workers = jobs * 8 if translation_batcher.window > 0 else jobs
+    pending = deque()
+    executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="cli-translator")
+    try:
+        for label, text, record, error in iter_cli_items(args.paths, args.input_format, args.field):
+            if error is None:
+                future = executor.submit(translate_item, text)
+            else:
+                future = Future()
+                future.set_exception(ValueError(error))
+            pending.append((label, text, record, future))
+            if len(pending) >= workers * 4:
+                write_result(*pending.popleft())
+        while pending:
+            write_result(*pending.popleft())
+    except KeyboardInterrupt:
+        for item in pending:
+            item[3].cancel()
+        print("\nInterrupted", file=sys.stderr)
+        return 130
+    finally:
+        executor.shutdown(wait=False)
+        out.flush()
+        if out is not sys.stdout:
+            out.close()
+        translation_cache.close()
+    progress.report()
+    return 1 if progress.failed else 0
+
+# Run the resident translation daemon without a window, or control a running one
+def run_daemon(args):
+    existing = find_running_instance()
+    if args.status:
+        if existing is None:
+            print("No translator instance is running")
+            return 1
+        print(json.dumps({"mode": existing.mode, "port": int(existing.base_url.rsplit(":", 1)[1]),
+                          "stats": existing.stats()}, indent=2, ensure_ascii=False))
+        return 0
+    if args.stop:
+        if existing is None or existing.mode != "daemon":
+            print("No translation daemon is running")
+            return 1
+        existing.shutdown()
+        print("Translation daemon stopped")
+        return 0
+    if existing is not None:
+        print(f"A translator instance ({existing.mode}) is already running")
+        return 1
+
+    server = start_translation_server("daemon")
+    if server is None:
+        return 1
+    print(f"Translation daemon listening on {DAEMON_HOST}:{server.server_address[1]}")
+    get_translator()
+    translation_engine._ensure_started()
+    translation_cache.open()
+    if args.watch or WATCH_CLIPBOARD:
+        clipboard_watcher.start()
+    try:
+        # Wait with a timeout so Ctrl+C is handled promptly
+        while not server.stop_requested.wait(0.5):
+            pass
+    except KeyboardInterrupt:
+        pass
+    clipboard_watcher.stop()
+    stop_translation_server(server)
+    translation_cache.close()
+    return 0
+
+def main(argv=None):
+    global startup_timing_requested
+    parser = argparse.ArgumentParser(description="Translate clipboard text to Japanese.")
+    parser.add_argument("--no-startup-dialog", action="store_true",
+                        help="Don't show the startup message window")
+    parser.add_argument("--watch", action="store_true",
+                        help="Watch the clipboard and translate new text in the background")
+    parser.add_argument("--startup-timing", action="store_true",
+                        help="Print a startup timing report once the translator is warm")
+    parser.add_argument("--targets", help="Comma-separated target languages, e.g. ja,zh-cn,ko "
+                                          "(default: $CJT_TARGET_LANGUAGES or ja)")
+    subparsers = parser.add_subparsers(dest="command")
+    translate_parser = subparsers.add_parser(
+        "translate", help="Translate files, directories or stdin without the GUI")
+    translate_parser.add_argument("paths", nargs="*", help="Files or directories to translate (default: stdin)")
+    translate_parser.add_argument("--dest", help="Target language (default: the first of --targets)")
+    translate_parser.add_argument("--src", default="auto", help="Source language (default: auto-detect)")
+    translate_parser.add_argument("--input-format", choices=["auto", "lines", "jsonl"], default="auto",
+                                  help="How to read inputs (default: by file extension, lines for stdin)")
+    translate_parser.add_argument("--output-format", choices=["text", "jsonl"],
+                                  help="How to write results (default: jsonl for JSONL input, otherwise text)")
+    translate_parser.add_argument("--field", default="text", help="JSONL field holding the text (default: text)")
+    translate_parser.add_argument("-o", "--output", help="Write results to this file instead of stdout")
+    translate_parser.add_argument("-j", "--jobs", type=int, default=TRANSLATION_CONCURRENCY,
+                                  help=f"Parallel translations (default: {TRANSLATION_CONCURRENCY})")
+    translate_parser.add_argument("-q", "--quiet", action="store_true", help="Don't report progress")
+    translate_parser.add_argument("--no-daemon", action="store_true",
+                                  help="Don't use a running translator instance, translate in this process")
+    daemon_parser = subparsers.add_parser(
+        "daemon", help="Run a resident translation service that other tools can share")
+    daemon_parser.add_argument("--status", action="store_true", help="Show the running instance and its stats")
+    daemon_parser.add_argument("--stop", action="store_true", help="Stop the running daemon")
+
+    # Ignore unknown arguments when starting the GUI (e.g. -psn_* from the macOS Finder)
+    args, unknown = parser.parse_known_args(argv)
+    if args.targets:
+        targets = [code.strip().lower() for code in args.targets.split(",") if code.strip()]
+        if not targets:
+            parser.error("--targets needs at least one language code")
+        TARGET_LANGUAGES[:] = OrderedDict.fromkeys(targets)
+    if args.command == "translate" and not args.dest:
+        args.dest = TARGET_LANGUAGES[0]
+    if args.command == "translate":
+        if unknown:
+            parser.error(f"unrecognized arguments: {' '.join(unknown)}")
+        sys.exit(run_cli_translate(args))
+    if args.command == "daemon":
+        if unknown:
+            parser.error(f"unrecognized arguments: {' '.join(unknown)}")
+        sys.exit(run_daemon(args))
+    startup_timing_requested = args.startup_timing
+    if args.watch or WATCH_CLIPBOARD:
+        clipboard_watcher.start()
+    run_gui(show_startup_dialog=not args.no_startup_dialog and os.environ.get("CJT_STARTUP_DIALOG", "1") == "1")
+
+if __name__ == "__main__":
+    main()
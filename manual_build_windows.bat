@@ -51,7 +51,7 @@ echo     ['clipboard_translator_cross_platform.py'], >> clipboard_translator.spe
 echo     pathex=[], >> clipboard_translator.spec
 echo     binaries=[], >> clipboard_translator.spec
 echo     datas=[('README.md', '.')], >> clipboard_translator.spec
-echo     hiddenimports=['win32api', 'win32con'], >> clipboard_translator.spec
+echo     hiddenimports=['win32api', 'win32con', 'tkinter', 'tkinter.messagebox', 'tkinter.ttk', 'pyperclip', 'googletrans', 'httpx', 'asyncio', 'keyboard', 'win10toast', 'http.server', 'socketserver', 'secrets'], >> clipboard_translator.spec
 echo     hookspath=[], >> clipboard_translator.spec
 echo     hooksconfig={}, >> clipboard_translator.spec
 echo     runtime_hooks=[], >> clipboard_translator.spec
@@ -95,7 +95,7 @@ python -m PyInstaller clipboard_translator.spec
 if %ERRORLEVEL% NEQ 0 (
     echo ERROR: PyInstaller failed.
     echo Attempting fallback build method...
-    python -m PyInstaller --onefile --windowed --hidden-import=win32api --hidden-import=win32con --icon=icon.ico --add-data="README.md;." clipboard_translator_cross_platform.py
+    python -m PyInstaller --onefile --windowed --hidden-import=win32api --hidden-import=win32con --hidden-import=tkinter --hidden-import=tkinter.messagebox --hidden-import=tkinter.ttk --hidden-import=pyperclip --hidden-import=googletrans --hidden-import=httpx --hidden-import=asyncio --hidden-import=keyboard --hidden-import=win10toast --hidden-import=http.server --hidden-import=socketserver --hidden-import=secrets --icon=icon.ico --add-data="README.md;." clipboard_translator_cross_platform.py
     
     if %ERRORLEVEL% NEQ 0 (
         echo ERROR: Both build methods failed.
@@ -0,0 +1,31 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from clipboard_translator_cross_platform import detect_language  # noqa: E402
+
+
+@pytest.mark.parametrize("text", [
+    "@john can you check this?",
+    "for example:",
+    "Please bring the following items:\n- bread\n- milk",
+    "Please see the attached file;",
+    "Total = 5 apples",
+    "Hi team,\n@john can you check this?\nTotal = 5 apples\nPlease see the attached file;",
+    "We need the following:\nfor example:\nwith the following items:",
+])
+def test_prose_is_not_code(text):
+    assert detect_language(text) != "code"
+
+
+@pytest.mark.parametrize("text", [
+    "def add(a, b):\n    total = a + b\n    return total\n",
+    "import os\n\nfor name in os.listdir('.'):\n    if name.endswith('.py'):\n        print(name)\n",
+    "function greet(name) {\n  const msg = 'Hi ' + name;\n  console.log(msg);\n  return msg;\n}\n",
+    "#include <stdio.h>\nint main() {\n    printf(\"hi\\n\");\n    return 0;\n}\n",
+])
+def test_code_is_detected(text):
+    assert detect_language(text) == "code"
@@ -0,0 +1,38 @@
+import os
+import sys
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import clipboard_translator_cross_platform as app  # noqa: E402
+
+
+class LimitedBackend(app.TranslationBackend):
+    name = "limited-test"
+
+    def __init__(self):
+        super().__init__()
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def translate(self, text, dest='ja', src='auto'):
+        with self._lock:
+            self.calls += 1
+        return text.upper()
+
+
+def test_chunks_queued_for_rate_limit_keep_their_deadline(monkeypatch):
+    backend = LimitedBackend()
+    monkeypatch.setitem(app.translation_backends, backend.name, backend)
+    monkeypatch.setattr(app, "TRANSLATION_BACKEND", backend.name)
+    # 40 chunks at 20 requests/s take about 2 s, twice the per-request deadline
+    monkeypatch.setattr(app, "rate_limiter", app.TokenBucket(20.0, 2))
+    monkeypatch.setattr(app, "translation_engine", app.AsyncTranslationEngine(concurrency=4, deadline=1.0))
+    text = "".join(f"Sentence number {index} of the long text. " for index in range(40))
+    chunks = app.split_into_chunks(text, 50)
+    assert len(chunks) == 40
+
+    translated = app.translate_long_text(text, max_chars=50)
+
+    assert translated == text.upper()
+    assert backend.calls == 40
@@ -0,0 +1,54 @@
+import asyncio
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import clipboard_translator_cross_platform as app  # noqa: E402
+
+
+class SlowBackend(app.TranslationBackend):
+    name = "slow-test"
+
+    def __init__(self, delay):
+        super().__init__()
+        self.delay = delay
+        self.release = threading.Event()
+
+    def translate(self, text, dest='ja', src='auto'):
+        if text == "block":
+            self.release.wait(self.delay)
+        return text.upper()
+
+
+@pytest.fixture
+def backend(monkeypatch):
+    backend = SlowBackend(delay=2.0)
+    monkeypatch.setitem(app.translation_backends, backend.name, backend)
+    yield backend
+    backend.release.set()
+
+
+def test_background_request_starts_with_single_token_bucket(monkeypatch, backend):
+    monkeypatch.setattr(app, "rate_limiter", app.TokenBucket(1.0, 1))
+    engine = app.AsyncTranslationEngine(concurrency=2, deadline=5, interactive_slots=1)
+    future = engine.submit("hello", backend=backend.name, priority=app.BACKGROUND)
+    assert future.result(timeout=5) == "HELLO"
+
+
+def test_queue_wait_counts_against_deadline(monkeypatch, backend):
+    monkeypatch.setattr(app, "rate_limiter", app.TokenBucket(100.0, 100))
+    engine = app.AsyncTranslationEngine(concurrency=1, deadline=5, interactive_slots=0)
+    blocking = engine.submit("block", backend=backend.name)
+    time.sleep(0.05)
+    started = time.monotonic()
+    queued = engine.submit("queued", backend=backend.name, deadline=0.3)
+    with pytest.raises(asyncio.TimeoutError):
+        queued.result(timeout=5)
+    assert time.monotonic() - started < 1.5
+    backend.release.set()
+    assert blocking.result(timeout=5) == "BLOCK"